@@ -2,12 +2,26 @@
 RAGシステムコアモジュール
 
 検索拡張生成（RAG）システムのコア機能を提供します。
+
+PDFRagSystemとReRankingRAGは、torchやsentence-transformersなどの重いライブラリを読み込むため、
+初めて参照されたときにインポートします（UIの起動時に読み込みを待たせないため）。
 """
 
-from .loaders.pdf import PDFRagSystem
-from .models.single_source import ReRankingRAG
+from .prompts import PROMPT_TEMPLATE
 
 __all__ = [
     'PDFRagSystem',
     'ReRankingRAG',
+    'PROMPT_TEMPLATE',
 ]
+
+
+def __getattr__(name):
+    """PDFRagSystemとReRankingRAGを、初めて参照されたときにインポートする"""
+    if name == 'PDFRagSystem':
+        from .loaders.pdf import PDFRagSystem
+        return PDFRagSystem
+    if name == 'ReRankingRAG':
+        from .models.single_source import ReRankingRAG
+        return ReRankingRAG
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
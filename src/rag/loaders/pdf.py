@@ -7,13 +7,92 @@ PDFファイルを読み込んで、検索可能な形式に変換するモジ
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.retrievers import BM25Retriever
 from langchain.docstore.document import Document
-from typing import List, Optional
+import chromadb
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional
+import hashlib
+import json
 import os
+import pickle
+
+import numpy as np
 
 from ..utils.text import clean_text
+from ..utils.embeddings import embedding_config, get_embeddings
+from ..utils.disk_cache import DiskCache
+from ..retrievers.bm25 import NumpyBM25Retriever
+
+# PyMuPDF（任意）：インストールされていれば、PDFのテキスト抽出に使う
+# （C言語のMuPDFで抽出するため、純Pythonのpypdf（PyPDFLoader）より大幅に速い）
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+
+# ベクトルを保存するChromaのコレクション名（LangChainのChromaのデフォルトと同じ）
+CHROMA_COLLECTION_NAME = "langchain"
+
+# コレクションのHNSWインデックス（近似最近傍探索）の設定
+# Semantic検索はReRankingRAGが全チャンクの埋め込みの行列で計算するため、HNSWは
+# 行列を使えない場合の代わりの検索にしか使わない。構築に時間のかかる設定（隣接数や構築時の探索幅）は
+# Chromaの既定のままにして、取り込みを遅くしない
+# 埋め込みは長さ1に正規化済みのため、距離はL2ではなく内積（ip）で計算する
+# （順位はコサイン類似度と同じで、距離計算が内積1回で済む）
+CHROMA_HNSW_CONFIG = {"space": "ip"}
+
+# 埋め込みの計算とChroma DBへの書き込みを行う単位（チャンク数）
+# （ChromaのSQLiteバックエンドのcollection.add()1回あたりの上限（約5,400件）より十分小さくする）
+INGEST_BATCH_SIZE = 256
+
+# 取り込み結果のキャッシュ（persist_dir内に保存する）
+# manifest.json: 元ファイルのハッシュと取り込み設定、bm25.pkl: チャンクとBM25のインデックス
+MANIFEST_FILE_NAME = "manifest.json"
+BM25_CACHE_FILE_NAME = "bm25.pkl"
+
+# 取り込み処理の版数（manifestに記録する）
+# テキストのクリーニング（clean_text）・BM25のトークン化（tokenize_for_bm25）・チャンクの分割や
+# 除外の処理を変えたときは、この値を1つ増やす（保存済みの取り込み結果が使われず、取り込み直される）
+INGEST_VERSION = 2
+
+# チャンクの埋め込みベクトルのキャッシュ（persist_dir内に保存する）
+# チャンクの内容と埋め込みの設定のハッシュ → ベクトル（float32のバイト列）
+# 取り込み設定を変えたり、一部だけ変わったファイルを読み込み直したりした場合に、
+# 内容が同じチャンクは埋め込みを計算し直さない
+# 保存する件数には上限を設け、超えた分は使われていない順に削除する
+# （384次元のfloat32で1件約1.5KBのため、上限まで保存しても約30MB）
+EMBEDDING_CACHE_FILE_NAME = "embedding_cache.sqlite3"
+EMBEDDING_CACHE_MAX_ENTRIES = 20000
+
+
+def _iter_pdf_pages(pdf_path: str) -> Iterator[Document]:
+    """
+    PDFを1ページずつDocumentとして返す
+    
+    PyMuPDFがインストールされていればそれを使い、なければPyPDFLoaderで読み込む。
+    どちらの場合もmetadataの"page"は0始まりのページ番号、"source"はファイルのパス。
+    """
+    if pymupdf is None:
+        yield from PyPDFLoader(pdf_path).lazy_load()
+        return
+    
+    with pymupdf.open(pdf_path) as pdf:
+        total_pages = pdf.page_count
+        for page_number, page in enumerate(pdf):
+            yield Document(
+                page_content=page.get_text(),
+                metadata={"source": pdf_path, "page": page_number, "total_pages": total_pages}
+            )
+
+
+def _file_sha256(path: str) -> str:
+    """ファイルの内容のSHA-256ハッシュを返す（大きなファイルも1MBずつ読み込む）"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
 
 
 class PDFRagSystem:
@@ -57,9 +136,8 @@ class PDFRagSystem:
         self.file_type: Optional[str] = None  # "pdf" or "text"
         
         # Semantic検索用のembeddingモデル（384次元で統一）
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        # （ReRankingRAGと同じインスタンスを共有し、重みを二重に読み込まない）
+        self.embeddings = get_embeddings()
 
         # Keyword検索用のBM25（後で初期化される）
         self.bm25 = None
@@ -69,56 +147,65 @@ class PDFRagSystem:
         PDFファイルを読み込んで、検索可能な形式に変換する
         
         処理の流れ：
-        1. PDFをテキストに変換
-        2. テキストを適切なサイズのチャンクに分割
+        1. PDFを1ページずつテキストに変換（PyMuPDFがあればそれを使う）
+        2. ページごとにテキストを適切なサイズのチャンクに分割
         3. 短すぎるチャンクを除外
         4. BM25検索器を構築（キーワード検索用）
         5. Chroma DBを生成（意味検索用のベクトルDB）
+        
+        同じ内容のファイルを同じ設定で取り込み済みの場合は、保存済みのChroma DBと
+        BM25のインデックスを読み込むだけで終了する（埋め込みの再計算を行わない）。
+        
+        全ページ・全チャンクをリストとして一度に展開せず、1ページ分ずつ
+        分割・クリーニングして、採用するチャンクだけを残す（読み込み時のメモリを抑える）。
         """
-        # PDFをテキストに変換
-        raw_docs = PyPDFLoader(pdf_path).load()
+        self.file_path = pdf_path
+        self.file_type = "pdf"
 
-        # テキストを適切なサイズのチャンクに分割
+        # 前回と同じファイル・同じ設定なら、保存済みの取り込み結果を使う
+        file_hash = _file_sha256(pdf_path)
+        if self._load_cache(file_hash):
+            return
+
+        # テキストを適切なサイズのチャンクに分割する分割器
         splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.chunk_size,      # 1つのチャンクの最大文字数
             chunk_overlap=self.chunk_overlap, # チャンク間の重複文字数
             separators=["\n\n", "\n", "。", ".", " ", ""]
         )
 
-        # PDFをチャンクに分割
-        chunks = splitter.split_documents(raw_docs)
-
-        # チャンクをクリーニングして整理
+        # PDFを1ページずつ読み込み、チャンクに分割してクリーニング
         cleaned = []
-        for idx, c in enumerate(chunks):
-            # テキストをクリーニング（不要な改行などを削除）
-            text = clean_text(c.page_content)
-            
-            # 文章が存在し、短すぎないチャンクだけ採用
-            if text and len(text) > self.min_chunk_length:
-                # metadataにチャンク識別子を追加
-                chunk_id = f"chunk_{c.metadata.get('page', 0)}_{idx}"
-                metadata = c.metadata.copy()
-                metadata['chunk_id'] = chunk_id
-                cleaned.append(Document(page_content=text, metadata=metadata))
+        idx = 0  # 全ページ通しのチャンク番号
+        for page in _iter_pdf_pages(pdf_path):
+            for chunk_text in splitter.split_text(page.page_content):
+                # クリーニングで文字数が増えることはないため、クリーニング前の時点で
+                # 短すぎるチャンクは、正規表現の置換を行わずに除外する
+                if len(chunk_text) > self.min_chunk_length:
+                    # テキストをクリーニング（不要な改行などを削除）
+                    text = clean_text(chunk_text)
+                    
+                    # クリーニング後も短すぎないチャンクだけ採用
+                    if len(text) > self.min_chunk_length:
+                        # metadataにチャンク識別子を追加
+                        chunk_id = f"chunk_{page.metadata.get('page', 0)}_{idx}"
+                        metadata = page.metadata.copy()
+                        metadata['chunk_id'] = chunk_id
+                        cleaned.append(Document(page_content=text, metadata=metadata))
+                idx += 1
 
         # クリーニング済みのチャンクを保存
         self.docs = cleaned
 
         # キーワード検索用のBM25検索器を構築
-        self.bm25 = BM25Retriever.from_documents(self.docs)
-        self.bm25.k = 60  # 候補取得数
-
-        # Chroma DB の初期化（古いDBが残っていたら削除して新規作成）
-        if os.path.exists(self.persist_dir):
-            os.system(f"rm -rf {self.persist_dir}")
+        # （転置インデックスをnumpy配列として前計算し、検索時はベクトル演算でスコアを計算する）
+        self.bm25 = NumpyBM25Retriever.from_documents(self.docs, k=60)  # k: 候補取得数
 
         # ベクトルDB（Semantic検索用）を生成
-        self.vectorstore = Chroma.from_documents(
-            self.docs,
-            self.embeddings,
-            persist_directory=self.persist_dir
-        )
+        self._build_vectorstore()
+
+        # 次回以降の取り込みで再利用できるよう、取り込み結果を保存
+        self._save_cache(file_hash)
     
     def import_text_file(self, text_path: str):
         """
@@ -131,12 +218,19 @@ class PDFRagSystem:
         4. BM25検索器を構築（キーワード検索用）
         5. Chroma DBを生成（意味検索用のベクトルDB）
         
+        同じ内容のファイルを同じ設定で取り込み済みの場合は、保存済みの結果を読み込むだけで終了する。
+        
         Args:
             text_path: テキストファイルのパス
         """
         self.file_path = text_path
         self.file_type = "text"
         
+        # 前回と同じファイル・同じ設定なら、保存済みの取り込み結果を使う
+        file_hash = _file_sha256(text_path)
+        if self._load_cache(file_hash):
+            return
+        
         # テキストファイルを読み込む
         try:
             with open(text_path, 'r', encoding='utf-8') as f:
@@ -165,11 +259,16 @@ class PDFRagSystem:
         # チャンクをクリーニングして整理
         cleaned = []
         for idx, c in enumerate(chunks):
+            # クリーニングで文字数が増えることはないため、クリーニング前の時点で
+            # 短すぎるチャンクは、正規表現の置換を行わずに除外する
+            if len(c.page_content) <= self.min_chunk_length:
+                continue
+            
             # テキストをクリーニング（不要な改行などを削除）
             text = clean_text(c.page_content)
             
-            # 文章が存在し、短すぎないチャンクだけ採用
-            if text and len(text) > self.min_chunk_length:
+            # クリーニング後も短すぎないチャンクだけ採用
+            if len(text) > self.min_chunk_length:
                 # metadataにチャンク識別子を追加
                 chunk_id = f"chunk_0_{idx}"
                 metadata = c.metadata.copy()
@@ -180,16 +279,184 @@ class PDFRagSystem:
         self.docs = cleaned
         
         # キーワード検索用のBM25検索器を構築
-        self.bm25 = BM25Retriever.from_documents(self.docs)
-        self.bm25.k = 60  # 候補取得数
-        
-        # Chroma DB の初期化（古いDBが残っていたら削除して新規作成）
-        if os.path.exists(self.persist_dir):
-            os.system(f"rm -rf {self.persist_dir}")
+        # （転置インデックスをnumpy配列として前計算し、検索時はベクトル演算でスコアを計算する）
+        self.bm25 = NumpyBM25Retriever.from_documents(self.docs, k=60)  # k: 候補取得数
         
         # ベクトルDB（Semantic検索用）を生成
-        self.vectorstore = Chroma.from_documents(
-            self.docs,
-            self.embeddings,
-            persist_directory=self.persist_dir
-        )
\ No newline at end of file
+        self._build_vectorstore()
+
+        # 次回以降の取り込みで再利用できるよう、取り込み結果を保存
+        self._save_cache(file_hash)
+    
+    def _build_vectorstore(self):
+        """
+        チャンクをベクトル化してChroma DBに保存する
+        
+        Chroma.from_documents()を使わずに、チャンクをINGEST_BATCH_SIZE件ずつまとめて埋め込み、
+        計算済みのベクトルをコレクションに直接追加する。
+        書き込みは別スレッドで行い、あるバッチを書き込んでいる間に次のバッチの埋め込みを計算する
+        （処理時間が「埋め込み + 書き込み」の合計から、ほぼ長い方だけになる）。
+        """
+        # 古い取り込み結果のキャッシュを削除（manifestから消して、途中で失敗しても再利用されないようにする）
+        for name in (MANIFEST_FILE_NAME, BM25_CACHE_FILE_NAME):
+            try:
+                os.remove(os.path.join(self.persist_dir, name))
+            except FileNotFoundError:
+                pass
+        
+        # 追加するデータを用意（IDにはチャンク識別子を使う）
+        texts = [d.page_content for d in self.docs]
+        metadatas = [d.metadata for d in self.docs]
+        ids = [m['chunk_id'] for m in metadatas]
+        
+        # ReRankingRAGが開くのと同じ、LangChainのデフォルトコレクションに保存する
+        client = chromadb.PersistentClient(path=self.persist_dir)
+        # Chroma DB の初期化（古いコレクションが残っていたら削除して新規作成）
+        # フォルダごと削除すると、同じプロセスで開いているクライアントのDBが読み取り専用になるため、
+        # クライアント経由でコレクションを削除する
+        try:
+            client.delete_collection(CHROMA_COLLECTION_NAME)
+        except Exception:
+            pass
+        collection = client.get_or_create_collection(
+            CHROMA_COLLECTION_NAME,
+            # Chromaは渡された設定の辞書に既定値を書き足すため、定数を書き換えられないようコピーを渡す
+            configuration={"hnsw": dict(CHROMA_HNSW_CONFIG)}
+        )
+        # 埋め込みのキャッシュを開く（開けない・読み書きできない場合は、キャッシュを使わずに計算する）
+        # 取り込みが途中で失敗しても、withを抜けるときにキャッシュのファイルを閉じる
+        with DiskCache(os.path.join(self.persist_dir, EMBEDDING_CACHE_FILE_NAME),
+                       EMBEDDING_CACHE_MAX_ENTRIES) as embedding_cache, \
+                ThreadPoolExecutor(max_workers=1) as writer:
+            # バッチ単位でまとめて追加する（1件ずつ追加するより書き込みの往復が少ない）
+            pending = None
+            for start in range(0, len(ids), INGEST_BATCH_SIZE):
+                end = start + INGEST_BATCH_SIZE
+                vectors = self._embed_documents(texts[start:end], embedding_cache)
+                
+                # 前のバッチの書き込みが終わるのを待ってから（失敗していれば例外を出す）、このバッチを書き込む
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(
+                    collection.add,
+                    ids=ids[start:end],
+                    embeddings=vectors,
+                    documents=texts[start:end],
+                    metadatas=metadatas[start:end]
+                )
+            if pending is not None:
+                pending.result()
+        
+        self.vectorstore = Chroma(
+            client=client,
+            collection_name=CHROMA_COLLECTION_NAME,
+            embedding_function=self.embeddings
+        )
+
+    def _embed_documents(self, texts: List[str], cache: DiskCache) -> List[List[float]]:
+        """
+        チャンクの埋め込みを計算する（キャッシュにあるチャンクは計算しない）
+        
+        Args:
+            texts: チャンクの本文リスト
+            cache: 埋め込みのキャッシュ
+        
+        Returns:
+            各チャンクの埋め込みベクトル（textsと同じ順番）
+        """
+        # 埋め込みの設定（モデル・量子化の有無）が変わると別のキーになり、古いベクトルは使われない
+        config = json.dumps(embedding_config(), sort_keys=True)
+        keys = [hashlib.sha256(f"{config}\0{text}".encode("utf-8")).hexdigest() for text in texts]
+        
+        stored = cache.get_many(keys)
+        vectors: List[Optional[List[float]]] = [None] * len(texts)
+        missing = []
+        for i, key in enumerate(keys):
+            data = stored.get(key)
+            if data is not None:
+                vectors[i] = np.frombuffer(data, dtype=np.float32).tolist()
+            else:
+                missing.append(i)
+        
+        # キャッシュになかったチャンクだけをまとめて埋め込む
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+            cache.put_many([
+                (keys[i], np.asarray(vector, dtype=np.float32).tobytes())
+                for i, vector in zip(missing, computed)
+            ])
+        return vectors
+
+    def _manifest(self, file_hash: str) -> dict:
+        """取り込み結果を再利用してよいかの判定に使う情報（ファイルの内容と取り込み設定）"""
+        return {
+            "file_hash": file_hash,
+            "file_type": self.file_type,
+            # PDFはテキスト抽出に使うライブラリによって、抽出結果（チャンク）が変わる
+            "pdf_extractor": ("pymupdf" if pymupdf is not None else "pypdf") if self.file_type == "pdf" else None,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "min_chunk_length": self.min_chunk_length,
+            "embedding": embedding_config(),
+            "hnsw": CHROMA_HNSW_CONFIG,
+            "ingest_version": INGEST_VERSION,
+        }
+
+    def _save_cache(self, file_hash: str):
+        """
+        取り込み結果（チャンクとBM25のインデックス）とmanifestをpersist_dirに保存する
+        
+        manifestは最後に書き込むため、途中で失敗した場合は次回キャッシュが使われない。
+        """
+        with open(os.path.join(self.persist_dir, BM25_CACHE_FILE_NAME), "wb") as f:
+            pickle.dump(self.bm25, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        manifest = self._manifest(file_hash)
+        manifest["n_chunks"] = len(self.docs)
+        with open(os.path.join(self.persist_dir, MANIFEST_FILE_NAME), "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def _load_cache(self, file_hash: str) -> bool:
+        """
+        保存済みの取り込み結果を読み込む
+        
+        manifestのファイルハッシュと取り込み設定が一致し、Chroma DBのチャンク数も
+        一致する場合だけ、チャンク・BM25・ベクトルストアを復元する。
+        
+        Returns:
+            復元できた場合はTrue（取り込み処理を省略してよい）、それ以外はFalse
+        """
+        try:
+            with open(os.path.join(self.persist_dir, MANIFEST_FILE_NAME), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        n_chunks = manifest.pop("n_chunks", None)
+        if manifest != self._manifest(file_hash):
+            return False
+
+        try:
+            with open(os.path.join(self.persist_dir, BM25_CACHE_FILE_NAME), "rb") as f:
+                bm25 = pickle.load(f)
+        except Exception:
+            return False
+
+        client = chromadb.PersistentClient(path=self.persist_dir)
+        try:
+            collection = client.get_collection(CHROMA_COLLECTION_NAME)
+        except Exception:
+            return False
+        if collection.count() != n_chunks or len(bm25.docs) != n_chunks:
+            return False
+
+        self.bm25 = bm25
+        self.docs = bm25.docs
+        self.vectorstore = Chroma(
+            client=client,
+            collection_name=CHROMA_COLLECTION_NAME,
+            embedding_function=self.embeddings
+        )
+        return True
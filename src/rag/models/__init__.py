@@ -4,8 +4,9 @@ RAGモデルモジュール
 単一ソース対応のRAGモデルを提供します。
 """
 
-from .single_source import ReRankingRAG
+from .single_source import ReRankingRAG, PROMPT_TEMPLATE
 
 __all__ = [
     'ReRankingRAG',
+    'PROMPT_TEMPLATE',
 ]
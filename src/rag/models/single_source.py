@@ -5,16 +5,114 @@
 """
 
 from langchain_community.vectorstores import Chroma
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_community.retrievers import BM25Retriever
-from langchain.retrievers import EnsembleRetriever
 from langchain_community.llms import Ollama
 from langchain.prompts import PromptTemplate
 from langchain.docstore.document import Document
 from sentence_transformers import CrossEncoder
-from typing import List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
+import os
+import re
+import threading
 
+import numpy as np
+import torch
+
+from ..prompts import PROMPT_TEMPLATE
 from ..utils.text import clean_text
+from ..utils.embeddings import CachedQueryEmbeddings, get_embeddings
+from ..utils.ranking import top_k_indices
+from ..utils.disk_cache import DiskCache
+from ..retrievers.bm25 import NumpyBM25Retriever
+
+
+# LLMの回答から「結論」で始まる最初の行を取り出すための正規表現（1回だけコンパイル）
+# 行頭の空白（改行以外）を許し、その行の終わりまでを取り出す
+_CONCLUSION_RE = re.compile(r"^[^\S\n]*結論[^\n]*", re.MULTILINE)
+
+# 検索結果が空だった場合の回答
+_NO_RESULTS_MESSAGE = "申し訳ございませんが、関連する情報が見つかりませんでした。"
+
+# CrossEncoderで1回の順伝播にまとめる(質問, 文書)の組の数
+# 組はトークン数の順に並べてからこの数ずつ評価するため、長さの近いものどうしでパディングされる
+_RERANK_BATCH_SIZE = 16
+
+# 回答のキャッシュに保持する質問の数（古いものから破棄される）
+_ANSWER_CACHE_SIZE = 256
+
+# CrossEncoderのスコアの表を保持する質問の数（古いものから破棄される）
+_RERANK_SCORE_TABLE_SIZE = 64
+
+# 回答をディスクに保存するファイルの名前（persist_dirの中に作る。アプリを再起動しても回答を使い回すため）
+# 保存する回答の数には上限を設け、超えた分は使われていない順に削除する
+# （別のファイルを読み込んだ後は前のファイルの回答が使われなくなるため、いずれ削除される）
+ANSWER_CACHE_FILE_NAME = "answer_cache.sqlite3"
+ANSWER_CACHE_MAX_ENTRIES = 1000
+
+# Reciprocal Rank Fusionの定数（LangChainのEnsembleRetrieverと同じ値）
+_RRF_C = 60
+
+
+def _extract_conclusion(raw_answer: str) -> str:
+    """
+    LLMの回答から「結論：〜」の1行を取り出す
+    
+    回答全体を行に分割せず、正規表現1回で最初の該当行を探す。
+    見つからなければ保険として先頭1行を返す。
+    """
+    match = _CONCLUSION_RE.search(raw_answer)
+    if match:
+        return match.group(0).strip()
+    return raw_answer.partition("\n")[0].strip()
+
+
+def _reciprocal_rank_fusion(
+    result_lists: List[List[Document]],
+    weights: List[float],
+    limit: int
+) -> List[Document]:
+    """
+    複数の検索結果を重み付きReciprocal Rank Fusionで1つのランキングに統合する
+    
+    各検索結果の順位rank（1始まり）に対して weight / (rank + 60) を加算し、
+    合計スコアの高い順に並べる。同じ内容の文書は1件にまとめる。
+    （EnsembleRetrieverと同じ計算を、検索器オブジェクトを作らずに行う）
+    
+    Args:
+        result_lists: 各検索器の検索結果（順位順）
+        weights: 各検索器の重み
+        limit: 返す文書の最大数
+    
+    Returns:
+        統合スコアの高い順に並んだ文書リスト（最大limit件）
+    """
+    # 同じ内容の文書に同じ番号を振り、(番号, 加算するスコア)の配列を作る
+    index_by_content: Dict[str, int] = {}
+    unique_docs: List[Document] = []
+    indices: List[int] = []
+    contributions: List[np.ndarray] = []
+    for docs, weight in zip(result_lists, weights):
+        for doc in docs:
+            index = index_by_content.get(doc.page_content)
+            if index is None:
+                index = index_by_content[doc.page_content] = len(unique_docs)
+                unique_docs.append(doc)
+            indices.append(index)
+        contributions.append(weight / (np.arange(1, len(docs) + 1) + _RRF_C))
+    if not unique_docs:
+        return []
+
+    # 同じ文書のスコアをnp.add.atでまとめて加算する（Pythonの辞書で1件ずつ足す代わり）
+    scores = np.zeros(len(unique_docs))
+    np.add.at(scores, np.asarray(indices, dtype=np.intp), np.concatenate(contributions))
+
+    # 候補は高々数百件なので全件を安定ソートする（同点の場合は先に現れた文書を優先する）
+    ranked = np.argsort(-scores, kind="stable")[:limit]
+    return [unique_docs[i] for i in ranked]
+
 
 
 class ReRankingRAG:
@@ -27,25 +125,30 @@ class ReRankingRAG:
     - LLMを使って質問に対する結論を生成
     - weightsの比重を変えることで、検索の焦点を調整可能
     """
-    def __init__(self, docs: List[Document], persist_dir="./chroma_db"):
+    def __init__(self, docs: List[Document], persist_dir="./chroma_db", bm25: Optional[NumpyBM25Retriever] = None):
         """
         初期化メソッド
         
         Args:
             docs: 検索対象のチャンク化された文書リスト
             persist_dir: ベクトルデータベースの保存フォルダのパス
+            bm25: 構築済みのBM25検索器（PDFRagSystem.bm25など）
+                  指定しない場合はdocsから新しく構築する
         """
         # 検索対象チャンクを保持
         self.docs = docs
         self.persist_dir = persist_dir
 
         # embeddingモデル（Semantic検索用、384次元で統一）
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
-        )
+        # 同じ質問の再検索でMiniLMの推論をやり直さないよう、質問文の埋め込みをキャッシュする
+        # （モデル本体はPDFRagSystemと共有し、重みを二重に読み込まない）
+        self.embeddings = CachedQueryEmbeddings(get_embeddings())
 
-        # LLMモデル（Ollama llama3）
-        self.llm = Ollama(model="llama3:latest", temperature=0.0)
+        # LLMモデル（Ollama llama3）とリランキング用のCrossEncoderは、初めて使うときに作成する
+        # （llm・rerankerプロパティを参照。質問する前にReRankingRAGを作るだけなら、モデルを読み込まない）
+        self._llm: Optional[Ollama] = None
+        self._reranker: Optional[CrossEncoder] = None
+        self._reranker_lock = threading.Lock()
 
         # セマンティック検索器の初期化
         self.vectorstore = Chroma(
@@ -53,40 +156,153 @@ class ReRankingRAG:
             embedding_function=self.embeddings
         )
         self.semantic = self.vectorstore.as_retriever(search_kwargs={"k": 60})
+        self._semantic_k = self.semantic.search_kwargs["k"]
 
         # キーワード検索器（BM25）の初期化
-        self.bm25 = BM25Retriever.from_documents(self.docs)
-        self.bm25.k = 60
+        # 構築済みのものが渡された場合は、全チャンクのトークン化をやり直さずに使い回す
+        if bm25 is not None:
+            self.bm25 = bm25
+        else:
+            self.bm25 = NumpyBM25Retriever.from_documents(self.docs, k=60)
 
-        # リランキング用のCrossEncoderの初期化
-        self.reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2")
+        # Semantic検索とBM25検索を並行して実行するためのスレッドプール（検索のたびに作り直さない）
+        self._pool = ThreadPoolExecutor(max_workers=2)
         
-        # プロンプトテンプレートの初期化（デフォルト値、後で上書き可能）
-        template = """【参考情報】
-{context}
-
-【質問】
-{question}
-
-【指示】
-- 必ず日本語で回答する
-- 文脈に書かれている事実のみを使用する
-- 推測や一般知識を混ぜない
-- 答えられない場合は正直にその旨を伝える
-- 余計な説明はせず「結論：〜」の1行だけ出力してください"""
+        # 検索結果と回答のキャッシュ
+        # 同じ質問を同じ設定（k, 重み, 候補数）で再実行した場合は、検索・リランキング・LLMの呼び出しを省略する
+        # Semantic検索とBM25検索の結果は重みに依存しないため、質問ごとに別にキャッシュし、
+        # 重みだけを変えて再検索した場合は融合とリランキングだけをやり直す
+        # （別のファイルを読み込んだ場合は、ReRankingRAG自体が作り直されるためキャッシュも破棄される）
+        self._cached_retrieve = lru_cache(maxsize=64)(self._retrieve)
+        # CrossEncoderのスコアも重みに依存しない（質問と文書の組だけで決まる）ため、
+        # 質問ごとに「文書の本文 → スコア」の表を持ち、重みを変えて候補が入れ替わっても
+        # まだ評価していない文書だけをリランキングする
+        # （質問 → 表 のOrderedDictで保持し、_answersと同じく上限を超えたら古い質問から破棄する）
+        self._rerank_score_tables: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._rerank_score_tables_lock = threading.Lock()
+        self._cached_search = lru_cache(maxsize=64)(self._search)
+        # 回答はanswer()とstream_answer()の両方から読み書きするため、lru_cacheではなく
+        # (質問, 設定) → 回答 のOrderedDictで保持する（別スレッドの質問と同時に触らないようロックする）
+        self._answers: "OrderedDict[Tuple, str]" = OrderedDict()
+        self._answers_lock = threading.Lock()
+        
+        # 回答のディスクキャッシュ（メモリのキャッシュになければここを見る。Noneにすると使わない）
+        # 質問のたびに開き直さず、ReRankingRAGを作るときに1回だけ開いて使い続ける
+        # キーには検索対象のチャンクの内容のハッシュを含めるため、別のファイルの回答と混ざらない
+        self.answer_cache: Optional[DiskCache] = DiskCache(
+            os.path.join(self.persist_dir, ANSWER_CACHE_FILE_NAME), ANSWER_CACHE_MAX_ENTRIES
+        )
+        corpus_digest = hashlib.blake2b(digest_size=16)
+        for doc in self.docs:
+            corpus_digest.update(doc.page_content.encode("utf-8"))
+            corpus_digest.update(b"\0")
+        self._corpus_hash = corpus_digest.hexdigest()
         
+        # 全チャンクの埋め込みの行列（self.docsと同じ順番、初めて検索したときにChromaから1回だけ読み込む）
+        # Semantic検索は、Chromaに問い合わせずにこの行列と質問の埋め込みの積で計算する
+        # （このアプリで扱うチャンク数（数千件程度）では、全件の内積を計算してもSQLiteとHNSWを通すより速く、
+        #   近似ではない正確な上位件数が得られる）
+        self._doc_vectors: Optional[np.ndarray] = None
+        self._doc_vectors_loaded = False
+        
+        # プロンプトテンプレートの初期化（デフォルト値、後で上書き可能）
         self.prompt_template = PromptTemplate(
-            template=template,
+            template=PROMPT_TEMPLATE,
             input_variables=["context", "question"]
         )
 
+    @property
+    def prompt_template(self) -> Optional[PromptTemplate]:
+        """回答生成に使うプロンプトテンプレート"""
+        return self._prompt_template
+
+    @prompt_template.setter
+    def prompt_template(self, template: Optional[PromptTemplate]):
+        """
+        プロンプトテンプレートを設定する
+
+        PromptTemplate.format()は呼び出しのたびに入力変数の検証と辞書の組み立てを行うため、
+        テンプレート文字列のstr.formatをここで1回だけ取り出して、answer()ではそれを直接呼ぶ。
+        """
+        self._prompt_template = template
+        self._render_prompt = template.template.format if template is not None else None
+        
+        # テンプレートが変わると回答も変わるため、回答のキャッシュを破棄する
+        with self._answers_lock:
+            self._answers.clear()
+
+    @property
+    def llm(self) -> Ollama:
+        """回答生成に使うLLM（初めて参照されたときに作成する）"""
+        if self._llm is None:
+            # keep_alive="30m": 最後の呼び出しから30分間はOllamaがモデルをメモリに残す
+            #                   （Ollamaの既定の5分より長くして、質問の間隔が少し空いても再読み込みを待たずに済む。
+            #                    無期限にするとアプリを閉じた後もメモリを使い続けるため、期限は設ける）
+            # num_ctx: 文脈長はllama3の上限（8192トークン）にする
+            #          プロンプトは最大で 参考情報5件 × 1200文字 + 指示（約120文字）+ 質問 で約6,100文字になり、
+            #          llama3は日本語1文字あたり約1トークン以上を使うため、4096トークンでは収まらない
+            #          （収まらない分はOllamaがプロンプトの先頭から捨てるため、【指示】と【質問】から失われる）
+            #          呼び出しごとに値が変わるとOllamaがモデルを読み込み直すため、固定しておく
+            self._llm = Ollama(model="llama3:latest", temperature=0.0, keep_alive="30m", num_ctx=8192)
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm):
+        """回答生成に使うLLMを差し替える"""
+        self._llm = llm
+
+    @property
+    def reranker(self) -> CrossEncoder:
+        """
+        リランキング用のCrossEncoder（初めて参照されたときに読み込む）
+        
+        複数のスレッドから同時に参照されても、モデルは1回だけ読み込む。
+        """
+        if self._reranker is None:
+            with self._reranker_lock:
+                if self._reranker is None:
+                    self._reranker = self._load_reranker()
+        return self._reranker
+
+    def _load_reranker(self) -> CrossEncoder:
+        """CrossEncoderを読み込み、スコアの計算に使うトークナイザーとモデルを取り出す"""
+        # GPUが使える場合はGPUに載せ、FP16にして重みの転送量と行列演算のコストを半分にする
+        # CPUの場合は全結合層（nn.Linear）をint8に動的量子化し、int8の行列演算（AVX-VNNIなど）を使う
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        reranker = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2", device=device)
+        if device == "cuda":
+            reranker.model.half()
+        else:
+            torch.ao.quantization.quantize_dynamic(
+                reranker.model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+            )
+
+        # CrossEncoderの中身（トークナイザーとモデル）を直接使ってスコアを計算する
+        # （predict()の内部のバッチ分割やテンソルの作り直しを通さず、まとめて評価するため）
+        self._ce_tokenizer = reranker.tokenizer
+        self._ce_model = reranker.model.eval()
+        self._ce_max_length = reranker.max_length
+        return reranker
+
+    def warm_up(self):
+        """
+        LLMを事前に読み込んでおく
+        
+        Ollamaはモデルを初めて使うときに読み込むため、最初の質問だけ回答が大きく遅れます。
+        1トークンだけ生成させてモデルを読み込ませておき、最初の質問でその待ち時間が出ないようにします。
+        （回答生成と同じLLMの設定で呼び出すため、読み込まれたモデルがそのまま使われる）
+        リランキング用のCrossEncoderも、ここで先に読み込んでおきます。
+        """
+        self.reranker
+        self.llm.invoke("こんにちは", num_predict=1)
+
     def search(self, question: str, k: int, w_sem: float, w_key: float, candidate_k: int = 60) -> List[Document]:
         """
         ハイブリッド検索 + リランキングを実行する
         
         処理の流れ：
-        1. Semantic検索とBM25検索をEnsembleRetrieverで統合
-        2. weightsの比重（w_sem, w_key）で検索結果を調整
+        1. Semantic検索とBM25検索を並行して実行
+        2. weightsの比重（w_sem, w_key）でReciprocal Rank Fusionを行い、上位candidate_k件に絞る
         3. CrossEncoderで各候補を再評価してスコア計算
         4. スコアの高い順に並び替え（リランキング）
         5. 上位k件を返す
@@ -101,20 +317,137 @@ class ReRankingRAG:
         Returns:
             リランキング後の上位k件の文書リスト
         """
-        # ハイブリッド検索（Semantic + Keyword）
-        ensemble = EnsembleRetriever(
-            retrievers=[self.semantic, self.bm25],
-            weights=[w_sem, w_key]
+        # 同じ質問・同じ設定の検索結果はキャッシュから返す
+        # （呼び出し側でリストを変更してもキャッシュに影響しないよう、新しいリストにして返す）
+        return list(self._cached_search(question, k, w_sem, w_key, candidate_k))
+
+    def _search(self, question: str, k: int, w_sem: float, w_key: float, candidate_k: int) -> Tuple[Document, ...]:
+        """
+        search()の本体（キャッシュを通さずに検索 + リランキングを実行する）
+        """
+        # ハイブリッド検索（Semantic + Keyword）の結果を、重みで融合する
+        sem_hits, key_hits = self._cached_retrieve(question)
+        candidates = _reciprocal_rank_fusion(
+            [sem_hits, key_hits],
+            [w_sem, w_key],
+            candidate_k
         )
-        candidates = ensemble.get_relevant_documents(question)
 
         # リランキング（検索結果の再評価）
-        pairs: List[Tuple[str, str]] = [(question, d.page_content) for d in candidates]
-        scores = self.reranker.predict(pairs)
-        ranked = sorted(zip(candidates, scores), key=lambda x: x[1], reverse=True)
+        # 同じ質問で評価済みの文書はスコアを使い回し、未評価の文書だけをCrossEncoderに渡す
+        texts = [d.page_content for d in candidates]
+        score_table = self._rerank_score_table(question)
+        missing = [text for text in texts if text not in score_table]
+        if missing:
+            score_table.update(zip(missing, self._rerank_scores(question, missing).tolist()))
+        scores = np.array([score_table[text] for text in texts])
 
         # 上位k件を返す
-        return [doc for doc, _score in ranked[:k]]
+        return tuple(candidates[i] for i in top_k_indices(scores, k))
+
+    def _rerank_score_table(self, question: str) -> Dict[str, float]:
+        """質問のCrossEncoderのスコアの表（文書の本文 → スコア）を返す（なければ空の表を作る）"""
+        with self._rerank_score_tables_lock:
+            table = self._rerank_score_tables.get(question)
+            if table is not None:
+                self._rerank_score_tables.move_to_end(question)
+                return table
+            table = self._rerank_score_tables[question] = {}
+            if len(self._rerank_score_tables) > _RERANK_SCORE_TABLE_SIZE:
+                self._rerank_score_tables.popitem(last=False)
+            return table
+
+    def _retrieve(self, question: str) -> Tuple[Tuple[Document, ...], Tuple[Document, ...]]:
+        """
+        Semantic検索とBM25検索を実行し、それぞれの結果を返す（重みに依存しない部分）
+        
+        2つの検索は互いに独立しているため、スレッドプールで同時に実行する。
+        どちらもretrieverのget_relevant_documents()は通さず、検索処理を直接呼ぶ。
+        
+        Returns:
+            (Semantic検索の結果, BM25検索の結果) のタプル（それぞれ順位の高い順）
+        """
+        sem_future = self._pool.submit(self._semantic_search, question)
+        key_future = self._pool.submit(self.bm25.search, question)
+        return tuple(sem_future.result()), tuple(key_future.result())
+
+    def _semantic_search(self, question: str) -> List[Document]:
+        """
+        Semantic検索を実行する
+        
+        retriever（self.semantic）を通さず、キャッシュ付きの質問埋め込みで直接ベクトル検索する
+        （retrieverのコールバック処理などを省く。同じ質問の再検索ではMiniLMの推論も行われない）。
+        埋め込みは長さ1に正規化済みのため、全チャンクの行列との積（内積）がそのままコサイン類似度になる。
+        """
+        query_vector = self.embeddings.embed_query(question)
+        matrix = self._load_doc_vectors()
+        if matrix is None:
+            # Chromaの内容とself.docsが対応しない場合は、Chromaで検索する
+            return self.vectorstore.similarity_search_by_vector(query_vector, k=self._semantic_k)
+        
+        similarities = matrix @ np.asarray(query_vector, dtype=np.float32)
+        return [self.docs[i] for i in top_k_indices(similarities, self._semantic_k)]
+
+    def _load_doc_vectors(self) -> Optional[np.ndarray]:
+        """
+        全チャンクの埋め込みを、self.docsと同じ順番の行列としてChromaから読み込む（初回のみ）
+        
+        Returns:
+            埋め込みの行列（Chromaに保存されていないチャンクがある場合はNone）
+        """
+        if not self._doc_vectors_loaded:
+            stored = self.vectorstore.get(include=["embeddings", "documents"])
+            stored_rows = {text: row for row, text in enumerate(stored["documents"])}
+            rows = [stored_rows.get(doc.page_content) for doc in self.docs]
+            if rows and None not in rows:
+                self._doc_vectors = np.asarray(stored["embeddings"], dtype=np.float32)[rows]
+            self._doc_vectors_loaded = True
+        return self._doc_vectors
+
+    def _rerank_scores(self, question: str, texts: List[str]) -> np.ndarray:
+        """
+        CrossEncoderで(質問, 文書)の組をまとめて評価し、関連度スコアを返す
+        
+        候補（最大candidate_k件）を1回でトークン化し、トークン数の順に並べて
+        _RERANK_BATCH_SIZE件ずつ順伝播する。バッチは最も長い組に合わせてパディングされるため、
+        長さの近い組をまとめることで、パディング部分の無駄な計算を減らす。
+        推論だけなのでtorch.inference_mode()で勾配の記録を止める。
+        
+        Args:
+            question: 質問文
+            texts: 評価する文書の本文リスト
+        
+        Returns:
+            各文書のスコア（ロジット、大きいほど関連が高い）
+        """
+        if not texts:
+            return np.empty(0, dtype=np.float32)
+        
+        # CrossEncoderがまだ読み込まれていなければ、ここで読み込む
+        self.reranker
+        
+        # パディングせずにトークン化し、トークン数の短い順に並べる
+        encoded = self._ce_tokenizer(
+            [question] * len(texts),
+            texts,
+            truncation=True,
+            max_length=self._ce_max_length
+        )
+        order = np.argsort([len(ids) for ids in encoded["input_ids"]], kind="stable")
+        
+        scores = np.empty(len(texts), dtype=np.float32)
+        with torch.inference_mode():
+            for start in range(0, len(order), _RERANK_BATCH_SIZE):
+                batch = order[start:start + _RERANK_BATCH_SIZE]
+                features = self._ce_tokenizer.pad(
+                    {name: [values[i] for i in batch] for name, values in encoded.items()},
+                    return_tensors="pt"
+                ).to(self._ce_model.device)
+                logits = self._ce_model(**features).logits
+                # 元の順番の位置に書き戻す
+                scores[batch] = logits.squeeze(-1).float().cpu().numpy()
+        
+        return scores
 
     def answer(self, question: str, k: int, w_sem: float, w_key: float, candidate_k: int = 60) -> str:
         """
@@ -135,33 +468,180 @@ class ReRankingRAG:
         Returns:
             「結論：〜」の形式の1行のみ（日本語）
         """
+        key = self._answer_cache_key(question, k, w_sem, w_key, candidate_k)
+        
+        # 同じ質問・同じ設定の回答はキャッシュから返す
+        cached = self._get_cached_answer(key)
+        if cached is not None:
+            return cached
+        
+        result = self._answer(question, k, w_sem, w_key, candidate_k)
+        self._store_answer(key, result)
+        return result
+    
+    def stream_answer(self, question: str, k: int, w_sem: float, w_key: float,
+                      candidate_k: int = 60) -> Iterator[str]:
+        """
+        answer()と同じ回答を、LLMが生成したそばから少しずつ返す
+        
+        LLMの出力から「結論：〜」の行が始まったら、その行の続きをトークンが届くたびに返し、
+        行が終わった時点で生成を打ち切る（それ以降の出力は表示しないため待たない）。
+        返した断片をつなげると、answer()の戻り値と同じ文字列になる。
+        キャッシュにある回答や、検索結果が空の場合の回答は、1つの断片として返す。
+        
+        Args:
+            question: 質問文
+            k: 検索結果から使用する文書数
+            w_sem: Semantic検索の重み
+            w_key: BM25検索の重み
+            candidate_k: リランキング前の候補数
+        
+        Yields:
+            回答の断片（文字列）
+        """
+        key = self._answer_cache_key(question, k, w_sem, w_key, candidate_k)
+        
+        cached = self._get_cached_answer(key)
+        if cached is not None:
+            yield cached
+            return
+        
+        top_docs = self.search(question, k, w_sem, w_key, candidate_k)
+        if not top_docs:
+            self._store_answer(key, _NO_RESULTS_MESSAGE)
+            yield _NO_RESULTS_MESSAGE
+            return
+        
+        prompt = self._build_prompt(question, top_docs)
+        
+        raw_answer = ""
+        emitted = ""
+        # 「結論」の行を探し始める位置（改行がまだ届いていない最後の行の先頭）
+        # 断片が届くたびに回答全体を探し直さず、終わった行は2度と探さない
+        scan_from = 0
+        for chunk in self.llm.stream(prompt):
+            raw_answer += chunk
+            match = _CONCLUSION_RE.search(raw_answer, scan_from)
+            if match is None:
+                scan_from = raw_answer.rfind("\n", scan_from) + 1
+                continue
+            scan_from = match.start()
+            
+            # 末尾の空白は、行の続きが届くまで返さずに保留する（strip()で落とされる場合があるため）
+            line = match.group(0).strip()
+            if len(line) > len(emitted):
+                yield line[len(emitted):]
+                emitted = line
+            
+            # 行末の改行まで届いたら、それ以降は生成させない
+            if match.end() < len(raw_answer):
+                break
+        
+        # 「結論」の行が見つからなかった場合などの残り（answer()と同じ抽出結果になるように）
+        result = _extract_conclusion(raw_answer)
+        if len(result) > len(emitted):
+            yield result[len(emitted):]
+        
+        self._store_answer(key, result)
+    
+    def _answer_cache_key(self, question: str, k: int, w_sem: float, w_key: float,
+                          candidate_k: int) -> Tuple[str, Tuple]:
+        """
+        回答のキャッシュのキーを作る（質問と設定を正規化する）
+        
+        正規化した質問はキーにだけ使い、検索やプロンプトには利用者が入力したままの質問を渡す。
+        
+        Returns:
+            (正規化した質問, 設定 (k, w_sem, w_key, candidate_k))
+        """
         # プロンプトテンプレートが設定されていない場合はエラー
         if self.prompt_template is None:
             raise ValueError("プロンプトテンプレートが設定されていません。")
         
+        # 前後や連続する空白の違いだけの質問は同じ質問として扱う
+        # 重みはスライダーの刻み（0.1）で丸め、浮動小数点の誤差でキャッシュが外れないようにする
+        return " ".join(question.split()), (k, round(w_sem, 2), round(w_key, 2), candidate_k)
+    
+    def _get_cached_answer(self, key: Tuple[str, Tuple]) -> Optional[str]:
+        """
+        同じ質問・同じ設定のキャッシュ済みの回答を返す（なければNone）
+        
+        メモリのキャッシュになければ、ディスクキャッシュを見る。
+        """
+        with self._answers_lock:
+            if key in self._answers:
+                self._answers.move_to_end(key)
+                return self._answers[key]
+        
+        # 前回の起動時に生成した回答（見つかればメモリのキャッシュにも載せる）
+        # ディスクの読み込みはDiskCacheがロックするため、メモリのキャッシュのロックは持たずに行う
+        cached = self._read_disk_answer(key)
+        if cached is not None:
+            with self._answers_lock:
+                self._answers[key] = cached
+                if len(self._answers) > _ANSWER_CACHE_SIZE:
+                    self._answers.popitem(last=False)
+        return cached
+    
+    def _store_answer(self, key: Tuple[str, Tuple], result: str):
+        """生成した回答をキャッシュに保存する"""
+        with self._answers_lock:
+            self._answers[key] = result
+            if len(self._answers) > _ANSWER_CACHE_SIZE:
+                self._answers.popitem(last=False)
+        self._write_disk_answer(key, result)
+    
+    def _disk_cache_key(self, key: Tuple[str, Tuple]) -> str:
+        """
+        ディスクキャッシュのキー
+        
+        質問と設定に加えて、検索対象のチャンク・プロンプト・LLMのモデルが同じ場合だけ
+        同じキーになるようにする（どれかが変わると回答も変わるため）。
+        """
+        question, settings = key
+        material = "|".join((
+            question, repr(settings), self._corpus_hash, self._prompt_template.template,
+            getattr(self.llm, "model", type(self.llm).__name__)
+        ))
+        return hashlib.blake2b(material.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _read_disk_answer(self, key: Tuple[str, Tuple]) -> Optional[str]:
+        """ディスクキャッシュから回答を読み込む（ない場合や読み込めない場合はNone）"""
+        if self.answer_cache is None:
+            return None
+        data = self.answer_cache.get(self._disk_cache_key(key))
+        return data.decode("utf-8") if data is not None else None
+    
+    def _write_disk_answer(self, key: Tuple[str, Tuple], result: str):
+        """回答をディスクキャッシュに書き込む（書き込めない場合は何もしない）"""
+        if self.answer_cache is None:
+            return
+        self.answer_cache.put(self._disk_cache_key(key), result.encode("utf-8"))
+    
+    def _answer(self, question: str, k: int, w_sem: float, w_key: float, candidate_k: int) -> str:
+        """
+        answer()の本体（キャッシュを通さずに検索とLLMによる回答生成を実行する）
+        """
         # 検索 → 上位k件の文脈をLLMへ
         top_docs = self.search(question, k, w_sem, w_key, candidate_k)
         
         # 検索結果が空の場合はエラーメッセージを返す
         if not top_docs:
-            return "申し訳ございませんが、関連する情報が見つかりませんでした。"
-        
-        # コンテキストを構築
-        context = "\n\n".join(d.page_content for d in top_docs)
-
-        # プロンプトを生成
-        prompt = self.prompt_template.format(context=context, question=question)
+            return _NO_RESULTS_MESSAGE
         
         # LLMに質問して回答を生成
-        raw_answer = self.llm.invoke(prompt)
+        raw_answer = self.llm.invoke(self._build_prompt(question, top_docs))
 
         # 結論1行だけ抽出
-        for line in raw_answer.split("\n"):
-            if line.strip().startswith("結論"):
-                return line.strip()
-        
-        # 保険：1行抽出できなければ先頭1行だけ返す
-        return raw_answer.split("\n")[0].strip()
+        return _extract_conclusion(raw_answer)
+    
+    def _build_prompt(self, question: str, top_docs: List[Document]) -> str:
+        """検索結果を文脈として、LLMに渡すプロンプトを組み立てる"""
+        # コンテキストを構築
+        context = "\n\n".join(d.page_content for d in top_docs)
+
+        # プロンプトを生成（事前に取り出したstr.formatで組み立てる）
+        return self._render_prompt(context=context, question=question)
 
     def generate_conclusion(self, question: str, k: int, w_sem: float, w_key: float, candidate_k: int = 60) -> str:
         """
@@ -0,0 +1,24 @@
+"""
+プロンプトテンプレート
+
+LLMに渡すプロンプトのテンプレートを定義するモジュール。
+UI側（RAGIntegration）からも読み込むため、重いライブラリ（torchなど）をインポートしない。
+"""
+
+
+# 回答生成用のプロンプトテンプレート（{context}と{question}が実際の値に置き換えられる）
+# 変わりにくい順に【指示】→【質問】→【参考情報】と並べ、LLM側のプロンプトキャッシュ
+# （前回と共通の先頭部分の再利用）が効くようにしている
+# （同じ質問を重みだけ変えて聞き直した場合、変わるのは末尾の【参考情報】だけになる）
+PROMPT_TEMPLATE = """【指示】
+- 必ず日本語で回答する
+- 文脈に書かれている事実のみを使用する
+- 推測や一般知識を混ぜない
+- 答えられない場合は正直にその旨を伝える
+- 余計な説明はせず「結論：〜」の1行だけ出力してください
+
+【質問】
+{question}
+
+【参考情報】
+{context}"""
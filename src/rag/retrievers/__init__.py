@@ -0,0 +1,9 @@
+"""
+検索器モジュール
+
+ハイブリッド検索で使用する検索器を提供します。
+"""
+
+from .bm25 import NumpyBM25Retriever
+
+__all__ = ['NumpyBM25Retriever']
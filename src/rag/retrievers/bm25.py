@@ -0,0 +1,162 @@
+"""
+BM25検索器
+
+転置インデックスをnumpy配列（CSR形式）で保持し、BM25スコアをベクトル演算で計算する検索器。
+"""
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List
+
+import numpy as np
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from langchain.docstore.document import Document
+from pydantic import Field
+
+from ..utils.ranking import top_k_indices
+from ..utils.text import tokenize_for_bm25
+
+
+class NumpyBM25Retriever(BaseRetriever):
+    """
+    numpyでスコアを計算するBM25検索器
+
+    LangChainのBM25Retriever（rank_bm25）は、質問の単語ごとに全チャンクをPythonのループで
+    走査するため、チャンク数が多いとキーワード検索が遅くなります。
+    このクラスは、インデックス構築時に以下を配列として前計算しておき、
+    検索時は質問の単語を含むチャンクだけをnumpyでまとめて計算します。
+
+    - indptr / doc_ids / term_freqs: 単語ごとの出現チャンクと出現回数（CSR形式の転置インデックス）
+    - idf: 単語ごとのIDF
+    - doc_norms: チャンクごとの文書長正規化項 k1 * (1 - b + b * 文書長 / 平均文書長)
+
+    スコアの計算式はrank_bm25のBM25Okapiと同じです（負のIDFはepsilon * 平均IDFに置き換え）。
+    """
+
+    docs: List[Document] = Field(repr=False)
+    """検索対象の文書リスト"""
+    k: int = 4
+    """返す文書の数"""
+    preprocess_func: Callable[[str], List[str]] = tokenize_for_bm25
+    """トークン化に使う関数（デフォルトは日本語を文字bigramに分けるtokenize_for_bm25）"""
+    k1: float = 1.5
+    b: float = 0.75
+
+    # 前計算したインデックス（from_documents()で構築される）
+    vocab: Dict[str, int] = Field(default_factory=dict, repr=False)
+    idf: Any = Field(default=None, repr=False)
+    indptr: Any = Field(default=None, repr=False)
+    doc_ids: Any = Field(default=None, repr=False)
+    term_freqs: Any = Field(default=None, repr=False)
+    doc_norms: Any = Field(default=None, repr=False)
+
+    @classmethod
+    def from_documents(
+        cls,
+        documents: Iterable[Document],
+        *,
+        preprocess_func: Callable[[str], List[str]] = tokenize_for_bm25,
+        k1: float = 1.5,
+        b: float = 0.75,
+        epsilon: float = 0.25,
+        **kwargs: Any
+    ) -> "NumpyBM25Retriever":
+        """
+        文書リストからBM25のインデックスを構築する
+
+        Args:
+            documents: 検索対象の文書リスト
+            preprocess_func: トークン化に使う関数
+            k1: 単語の出現回数の効き方を調整するパラメータ
+            b: 文書長による正規化の強さ
+            epsilon: 負のIDFを置き換える下限値の係数
+            **kwargs: その他の設定（kなど）
+
+        Returns:
+            構築済みのNumpyBM25Retriever
+        """
+        docs = list(documents)
+        tokenized = [preprocess_func(d.page_content) for d in docs]
+
+        # (単語ID, チャンク番号, 出現回数) の組を集める
+        vocab: Dict[str, int] = {}
+        term_ids: List[int] = []
+        doc_ids: List[int] = []
+        term_freqs: List[int] = []
+        for doc_idx, tokens in enumerate(tokenized):
+            for term, freq in Counter(tokens).items():
+                term_ids.append(vocab.setdefault(term, len(vocab)))
+                doc_ids.append(doc_idx)
+                term_freqs.append(freq)
+
+        # 単語IDの順に並べ替えて、単語ごとの出現チャンクを連続した区間にする（CSR形式）
+        term_ids_arr = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_ids_arr, kind="stable")
+        doc_freq = np.bincount(term_ids_arr, minlength=len(vocab))
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(doc_freq, out=indptr[1:])
+
+        # IDF（BM25Okapiと同じく、負の値はepsilon * 平均IDFに置き換える）
+        n_docs = len(docs)
+        idf = np.log(n_docs - doc_freq + 0.5) - np.log(doc_freq + 0.5)
+        if len(idf):
+            idf[idf < 0] = epsilon * idf.mean()
+
+        # 文書長による正規化項をチャンクごとに前計算しておく
+        doc_len = np.asarray([len(t) for t in tokenized], dtype=np.float64)
+        avgdl = doc_len.mean() if n_docs else 1.0
+        doc_norms = k1 * (1 - b + b * doc_len / (avgdl or 1.0))
+
+        return cls(
+            docs=docs,
+            preprocess_func=preprocess_func,
+            k1=k1,
+            b=b,
+            vocab=vocab,
+            idf=idf,
+            indptr=indptr,
+            doc_ids=np.asarray(doc_ids, dtype=np.int64)[order],
+            term_freqs=np.asarray(term_freqs, dtype=np.float64)[order],
+            doc_norms=doc_norms,
+            **kwargs
+        )
+
+    def get_scores(self, tokens: List[str]) -> np.ndarray:
+        """
+        トークン化済みの質問に対して、全チャンクのBM25スコアを計算する
+
+        Args:
+            tokens: トークン化された質問
+
+        Returns:
+            チャンクごとのスコア（self.docsと同じ順番）
+        """
+        scores = np.zeros(len(self.docs))
+        for term in tokens:
+            term_id = self.vocab.get(term)
+            if term_id is None:
+                continue
+            # この単語を含むチャンクだけをまとめて計算する
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            hit_docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end]
+            scores[hit_docs] += self.idf[term_id] * (
+                freqs * (self.k1 + 1) / (freqs + self.doc_norms[hit_docs])
+            )
+        return scores
+
+    def search(self, query: str) -> List[Document]:
+        """
+        質問に対してスコアの高い上位k件の文書を返す
+
+        get_relevant_documents()と同じ結果を、retrieverのコールバック処理を通さずに返す
+        （ReRankingRAGは検索のたびにこちらを直接呼ぶ）。
+        """
+        scores = self.get_scores(self.preprocess_func(query))
+        return [self.docs[i] for i in top_k_indices(scores, self.k)]
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        """質問に対してスコアの高い上位k件の文書を返す"""
+        return self.search(query)
@@ -2,8 +2,23 @@
 RAGユーティリティ関数
 
 RAGシステムで共通して使用されるユーティリティ関数を提供します。
+
+CachedQueryEmbeddingsとget_embeddingsはtorchやsentence-transformersを読み込むため、
+初めて参照されたときにインポートします（textやrankingだけを使う場合に、重いライブラリを読み込まないため）。
 """
 
-from .text import clean_text
+from .text import clean_text, tokenize_for_bm25
+from .ranking import top_k_indices
+
+__all__ = ['clean_text', 'tokenize_for_bm25', 'CachedQueryEmbeddings', 'get_embeddings', 'top_k_indices', 'DiskCache']
+
 
-__all__ = ['clean_text']
+def __getattr__(name):
+    """埋め込みモデルとディスクキャッシュを、初めて参照されたときにインポートする"""
+    if name in ('CachedQueryEmbeddings', 'get_embeddings'):
+        from . import embeddings
+        return getattr(embeddings, name)
+    if name == 'DiskCache':
+        from .disk_cache import DiskCache
+        return DiskCache
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
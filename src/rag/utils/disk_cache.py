@@ -0,0 +1,136 @@
+"""
+ディスクキャッシュ
+
+キー（文字列）→ 値（バイト列）をSQLiteのファイルに保存する、件数上限つきのキャッシュを提供します。
+埋め込みベクトルや生成した回答を、アプリを再起動しても使い回すために使います。
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# 1回の問い合わせで渡すキーの数（SQLiteのプレースホルダ数の上限（古い版では999）より小さくする）
+_QUERY_BATCH_SIZE = 500
+
+
+class DiskCache:
+    """
+    件数上限つきのディスクキャッシュ（SQLite）
+
+    キーごとに最後に使われた時刻を記録し、max_entries件を超えたら使われていない順に削除する。
+    shelve（dbm）と違い、OSによって保存形式が変わらず、1つのファイルに収まる。
+
+    キャッシュは無くても動作に影響しないため、ファイルを開けない・読み書きに失敗した場合
+    （ファイルが壊れている、別のプロセスが書き込み中など）も例外は出さず、
+    読み込みは「キャッシュになかった」、書き込みは「何もしなかった」ものとして扱う。
+    1つの接続を複数のスレッドから使えるよう、読み書きはロックで順番に行う。
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        """
+        Args:
+            path: キャッシュを保存するファイルのパス（なければ作成する）
+            max_entries: 保存する最大件数
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = sqlite3.connect(path, timeout=1.0, check_same_thread=False)
+        except sqlite3.Error:
+            return
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_used ON cache (used)")
+            conn.commit()
+        except sqlite3.Error:
+            conn.close()
+            return
+        self._conn = conn
+
+    def __enter__(self) -> "DiskCache":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """キーの値を返す（なければNone）"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: List[str]) -> Dict[str, bytes]:
+        """
+        複数のキーの値をまとめて読み込む
+
+        Returns:
+            キャッシュにあったキー → 値の辞書（なかったキーは含まない）
+        """
+        found: Dict[str, bytes] = {}
+        with self._lock:
+            if self._conn is None or not keys:
+                return found
+            try:
+                for start in range(0, len(keys), _QUERY_BATCH_SIZE):
+                    part = keys[start:start + _QUERY_BATCH_SIZE]
+                    found.update(self._conn.execute(
+                        f"SELECT key, value FROM cache WHERE key IN ({','.join('?' * len(part))})",
+                        part
+                    ))
+            except sqlite3.Error:
+                return {}
+
+            # 使われた時刻を更新して、よく使うものが削除されにくいようにする
+            if found:
+                now = time.time()
+                self._execute_write(
+                    "UPDATE cache SET used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+        return found
+
+    def put(self, key: str, value: bytes):
+        """キーの値を保存する"""
+        self.put_many([(key, value)])
+
+    def put_many(self, items: List[Tuple[str, bytes]]):
+        """
+        複数のキーの値をまとめて保存し、上限を超えた分を古い順に削除する
+
+        Args:
+            items: (キー, 値)のリスト
+        """
+        with self._lock:
+            if self._conn is None or not items:
+                return
+            now = time.time()
+            self._execute_write(
+                "INSERT OR REPLACE INTO cache (key, value, used) VALUES (?, ?, ?)",
+                [(key, value, now) for key, value in items]
+            )
+            self._execute_write(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                [(self.max_entries,)]
+            )
+
+    def _execute_write(self, sql: str, rows: List[tuple]):
+        """書き込みを実行してコミットする（失敗した場合は取り消して、何もしなかったことにする）"""
+        try:
+            self._conn.executemany(sql, rows)
+            self._conn.commit()
+        except sqlite3.Error:
+            try:
+                self._conn.rollback()
+            except sqlite3.Error:
+                pass
+
+    def close(self):
+        """ファイルを閉じる（閉じた後の読み書きは何もしない）"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
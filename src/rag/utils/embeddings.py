@@ -0,0 +1,111 @@
+"""
+埋め込みモデルユーティリティ
+
+埋め込みモデル（embedding）の共有インスタンスと、それを扱うラッパーを提供します。
+"""
+
+from functools import lru_cache
+from typing import List, Optional
+import threading
+
+import torch
+from langchain_community.embeddings import HuggingFaceEmbeddings
+from langchain_core.embeddings import Embeddings
+
+
+# 埋め込みモデルの名前（Semantic検索用、384次元で統一）
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+# 埋め込みモデルを動かすデバイス（NVIDIAのGPU → AppleシリコンのGPU（MPS） → CPUの順に選ぶ）
+if torch.cuda.is_available():
+    EMBEDDING_DEVICE = "cuda"
+elif torch.backends.mps.is_available():
+    EMBEDDING_DEVICE = "mps"
+else:
+    EMBEDDING_DEVICE = "cpu"
+
+# 1回にまとめて埋め込むチャンク数
+# GPUでは大きなバッチほど計算をまとめて並列化できるため、CPUより大きくする
+EMBEDDING_BATCH_SIZE = 64 if EMBEDDING_DEVICE == "cpu" else 128
+
+# CPUの場合は全結合層（nn.Linear）をint8に動的量子化する
+# （重みの転送量が1/4になり、int8の行列演算（AVX-VNNIなど）が使えるため、取り込み時の埋め込みが速くなる）
+EMBEDDING_INT8 = EMBEDDING_DEVICE == "cpu"
+
+# プロセス全体で共有する埋め込みモデル（get_embeddings()で初回に読み込まれる）
+_shared_embeddings: Optional[HuggingFaceEmbeddings] = None
+_shared_embeddings_lock = threading.Lock()
+
+
+def get_embeddings() -> HuggingFaceEmbeddings:
+    """
+    共有の埋め込みモデルを返す関数
+    
+    PDFRagSystemとReRankingRAGがそれぞれMiniLMを読み込むと、同じ重みがメモリに2つ載り、
+    読み込み時間も2倍かかります。この関数は初回だけモデルを読み込み、以降は同じインスタンスを返します。
+    
+    Returns:
+        HuggingFaceEmbeddingsのインスタンス（プロセス内で1つ）
+    """
+    global _shared_embeddings
+    with _shared_embeddings_lock:
+        if _shared_embeddings is None:
+            embeddings = HuggingFaceEmbeddings(
+                model_name=EMBEDDING_MODEL_NAME,
+                model_kwargs={"device": EMBEDDING_DEVICE},
+                encode_kwargs={
+                    # 取り込み時はチャンクをまとめて埋め込むため、既定（32件）より大きなバッチで計算する
+                    "batch_size": EMBEDDING_BATCH_SIZE,
+                    # 長さ1に正規化する（コサイン類似度が内積だけで計算でき、Chromaの内積（ip）空間で検索できる）
+                    "normalize_embeddings": True
+                }
+            )
+            if EMBEDDING_INT8:
+                torch.ao.quantization.quantize_dynamic(
+                    embeddings.client, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
+                )
+            _shared_embeddings = embeddings
+        return _shared_embeddings
+
+
+def embedding_config() -> dict:
+    """
+    埋め込みベクトルの計算方法を表す設定を返す
+    
+    量子化の有無で埋め込みベクトルがわずかに変わるため、保存済みのベクトルを
+    再利用してよいかの判定（PDFRagSystemのmanifest）に使う。
+    """
+    return {"model": EMBEDDING_MODEL_NAME, "int8": EMBEDDING_INT8, "normalized": True}
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """
+    質問文の埋め込みをキャッシュする埋め込みモデルのラッパー
+
+    同じ質問文で繰り返し検索した場合、MiniLMの推論をやり直さずに
+    前回計算した埋め込みベクトルを返します。
+    文書の埋め込み（embed_documents）はキャッシュせず、そのまま元のモデルに委譲します。
+    """
+    def __init__(self, base: Embeddings, maxsize: int = 1024):
+        """
+        初期化メソッド
+
+        Args:
+            base: 実際に埋め込みを計算する埋め込みモデル
+            maxsize: キャッシュする質問文の最大数（古いものから破棄される）
+        """
+        self.base = base
+
+        # 質問文 → 埋め込みベクトルのLRUキャッシュ
+        # （キャッシュした値が書き換えられないよう、タプルで保持する）
+        self._embed_query_cached = lru_cache(maxsize=maxsize)(
+            lambda text: tuple(self.base.embed_query(text))
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """文書の埋め込みを計算する（キャッシュしない）"""
+        return self.base.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """質問文の埋め込みを計算する（キャッシュにあれば再計算しない）"""
+        return list(self._embed_query_cached(text))
@@ -0,0 +1,35 @@
+"""
+ランキングユーティリティ
+
+スコア配列から上位の候補を選ぶ関数を提供します。
+"""
+
+import numpy as np
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    スコアの高い順に、上位k件のインデックスを返す
+
+    全件をソートせず、k番目に大きいスコアを求めてから上位k件だけを並べ替える。
+    （O(n log n)のPythonソートの代わりに、O(n) + O(k log k)の処理をnumpy内で行う）
+    同点の場合は、sorted()と同じく先に現れた（インデックスの小さい）候補を優先する。
+
+    Args:
+        scores: 各候補のスコア
+        k: 取り出す件数
+
+    Returns:
+        スコアの高い順に並んだインデックスの配列（最大k件）
+    """
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if len(scores) > k:
+        # np.argpartitionは境界（k番目のスコア）と同点の候補のうちどれを残すかが決まらないため、
+        # k番目のスコアより大きい候補をすべて残し、残りの枠を同点の候補からインデックスの小さい順に埋める
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        above = np.flatnonzero(scores > kth)
+        tied = np.flatnonzero(scores == kth)[:k - len(above)]
+        top = np.concatenate((above, tied))
+        return top[np.argsort(-scores[top], kind="stable")]
+    return np.argsort(-scores, kind="stable")
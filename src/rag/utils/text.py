@@ -1,15 +1,29 @@
 """
 テキスト処理ユーティリティ
 
-テキストのクリーニングなどの処理を行う関数を提供します。
+テキストのクリーニングや、キーワード検索用のトークン化などの処理を行う関数を提供します。
 """
 
 import re
 import warnings
+from typing import List
+
+# このモジュールの処理結果を変更したときは、loaders/pdf.pyのINGEST_VERSIONを1つ増やすこと
+# （変更前の処理で作った取り込み結果のキャッシュが使われないようにするため）
 
 # 警告ログを抑制（検索スコアなど不要なログを出さないため）
 warnings.filterwarnings("ignore")
 
+# チャンクごとに呼ばれるため、正規表現はモジュール読み込み時に1回だけコンパイルする
+# 3つ以上の連続する改行
+_MULTINEWLINE_RE = re.compile(r"\n{3,}")
+
+# キーワード検索用のトークン
+# - ひらがな・カタカナ・漢字の連続（後で2文字ずつに分ける）
+# - それ以外の英数字などの単語（コマンド名やオプションなど）
+_CJK_CHARS = "\u3005\u3041-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uff66-\uff9f"
+_TOKEN_RE = re.compile(rf"([{_CJK_CHARS}]+)|[^\W{_CJK_CHARS}]+")
+
 
 def clean_text(text: str) -> str:
     """
@@ -28,9 +42,40 @@ def clean_text(text: str) -> str:
         入力: "あいうえお\n\n\nかきくけこ"
         出力: "あいうえお\n\nかきくけこ"（連続する3つ以上の改行を2つに統一）
     """
-    # 正規表現を使って、3つ以上の連続する改行を2つの改行に置き換える
+    # 3つ以上の連続する改行を2つの改行に置き換える
     # r"\n{3,}" は「改行が3つ以上連続している部分」を意味する
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _MULTINEWLINE_RE.sub("\n\n", text)
     
     # 前後の空白を削除して返す
     return text.strip()
+
+
+def tokenize_for_bm25(text: str) -> List[str]:
+    """
+    キーワード検索（BM25）用に、日本語と英数字が混在するテキストをトークンに分ける関数
+    
+    日本語の文は空白で区切られていないため、空白区切り（str.split）では
+    1文が丸ごと1トークンになり、質問の単語とほとんど一致しません。
+    形態素解析器を使わずに、正規表現1回で文字種ごとのまとまりを取り出し、
+    日本語の部分は2文字ずつ（文字bigram）に分けます。英数字の単語は小文字にしてそのまま使います。
+    
+    Args:
+        text: トークン化するテキスト
+        
+    Returns:
+        トークンのリスト
+        
+    例：
+        入力: "Linuxの基本コマンド ls"
+        出力: ["linux", "の基", "基本", "本コ", "コマ", "マン", "ンド", "ls"]
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(text.lower()):
+        cjk = match.group(1)
+        if cjk is None:
+            tokens.append(match.group(0))
+        elif len(cjk) == 1:
+            tokens.append(cjk)
+        else:
+            tokens.extend([cjk[i:i + 2] for i in range(len(cjk) - 1)])
+    return tokens
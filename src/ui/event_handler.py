@@ -80,7 +80,8 @@ class EventHandler:
         3. RAG統合コンポーネントに質問を送信（検索と回答生成を実行）
         """
         # 入力フィールドからテキストを取得
-        user_input = self.ui.input_field.get("1.0", tk.END).strip()
+        # （tk.ENDまで取るとTextが末尾に自動で付ける改行まで含まれるため、その1文字手前までを取る）
+        user_input = self.ui.input_field.get("1.0", "end-1c").strip()
         
         # 入力が空の場合は何もしない
         if not user_input:
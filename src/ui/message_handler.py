@@ -12,9 +12,19 @@
 各メッセージには、タイムスタンプが自動的に追加されます。
 """
 
+import time
 import tkinter as tk
 from datetime import datetime
 
+# ストリーミング表示で追記する位置を示すマークの名前
+STREAM_MARK = "stream_end"
+
+# チャット表示エリアに残す最大の行数（これを超えたら古い行から削除する）
+MAX_DISPLAY_LINES = 5000
+
+# 最大の行数を超えたときに、まとめて削除する古い行の数
+TRIM_LINES = 500
+
 
 class MessageHandler:
     """
@@ -32,35 +42,80 @@ class MessageHandler:
             chat_display: チャット表示エリア（ScrolledTextウィジェット）
         """
         self.chat_display = chat_display
+        
+        # タイムスタンプ文字列のキャッシュ（同じ秒のうちはstrftimeを呼び直さない）
+        self._ts_second = None
+        self._ts_text = ""
+        
+        # ストリーミング表示の途中かどうか（begin_stream()からend_stream()まではTrue）
+        self._streaming = False
     
-    def add_system_message(self, message: str):
+    def _timestamp(self) -> str:
         """
-        システムメッセージを追加するメソッド
+        現在時刻のタイムスタンプ文字列（"HH:MM:SS"）を返すメソッド
         
-        システムからの通知メッセージ（例：「PDFファイルを読み込んでいます」）
-        をチャット表示エリアに追加します。
+        表示は秒単位なので、同じ秒の間に続けてメッセージが追加された場合は
+        前回作った文字列をそのまま使い回す。
+        """
+        second = int(time.time())
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_text = datetime.fromtimestamp(second).strftime("%H:%M:%S")
+        return self._ts_text
+    
+    def _append(self, tag: str, prefix: str, message: str):
+        """
+        タイムスタンプ付きのメッセージを1件追加するメソッド（各add_*_messageの共通処理）
         
         Args:
-            message: 表示するメッセージ（文字列）
+            tag: 適用するスタイルのタグ（"system", "user", "assistant", "error"）
+            prefix: メッセージの前に付ける種別（"SYSTEM"など）
+            message: 表示するメッセージ
         """
         # テキストエリアを編集可能にする
         self.chat_display.config(state=tk.NORMAL)
         
-        # 現在時刻を取得してタイムスタンプとして表示
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
         # タイムスタンプを追加（"timestamp"タグでスタイルを適用）
-        self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
+        self.chat_display.insert(tk.END, f"[{self._timestamp()}] ", "timestamp")
         
-        # システムメッセージを追加（"system"タグでスタイルを適用）
-        self.chat_display.insert(tk.END, f"SYSTEM: {message}\n\n", "system")
+        # メッセージを追加（種別ごとのタグでスタイルを適用）
+        self.chat_display.insert(tk.END, f"{prefix}: {message}\n\n", tag)
+        
+        # 長いセッションで表示内容が増え続けないよう、古い行を削除する
+        self._trim_history()
         
         # テキストエリアを編集不可に戻す（ユーザーが直接編集できないように）
-        self.chat_display.config(state=tk.DISABLED)
+        # ストリーミング表示の途中の場合は、end_stream()で戻すまで編集可能のままにしておく
+        if not self._streaming:
+            self.chat_display.config(state=tk.DISABLED)
         
         # 最新のメッセージまで自動的にスクロール
         self.chat_display.see(tk.END)
     
+    def _trim_history(self):
+        """
+        表示内容が長くなりすぎた場合に、古い行を削除するメソッド
+        
+        Tkのテキストウィジェットは内容が増えるほどメモリを使い、再描画やsee(END)も遅くなるため、
+        MAX_DISPLAY_LINES行を超えたら先頭のTRIM_LINES行を削除する。
+        テキストエリアが編集可能な状態で呼ぶこと。
+        """
+        line_count = int(self.chat_display.index("end-1c").split(".")[0])
+        if line_count > MAX_DISPLAY_LINES:
+            self.chat_display.delete("1.0", f"{TRIM_LINES + 1}.0")
+    
+    def add_system_message(self, message: str):
+        """
+        システムメッセージを追加するメソッド
+        
+        システムからの通知メッセージ（例：「PDFファイルを読み込んでいます」）
+        をチャット表示エリアに追加します。
+        
+        Args:
+            message: 表示するメッセージ（文字列）
+        """
+        self._append("system", "SYSTEM", message)
+    
     def add_user_message(self, message: str):
         """
         ユーザーメッセージを追加するメソッド
@@ -70,17 +125,7 @@ class MessageHandler:
         Args:
             message: ユーザーのメッセージ（質問文）
         """
-        self.chat_display.config(state=tk.NORMAL)
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # タイムスタンプを追加
-        self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        
-        # ユーザーメッセージを追加（"user"タグでスタイルを適用）
-        self.chat_display.insert(tk.END, f"USER: {message}\n\n", "user")
-        
-        self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        self._append("user", "USER", message)
     
     def add_assistant_message(self, message: str):
         """
@@ -91,17 +136,7 @@ class MessageHandler:
         Args:
             message: アシスタントのメッセージ（LLMの回答）
         """
-        self.chat_display.config(state=tk.NORMAL)
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # タイムスタンプを追加
-        self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        
-        # アシスタントメッセージを追加（"assistant"タグでスタイルを適用）
-        self.chat_display.insert(tk.END, f"ASSISTANT: {message}\n\n", "assistant")
-        
-        self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
+        self._append("assistant", "ASSISTANT", message)
     
     def add_error_message(self, message: str):
         """
@@ -112,15 +147,51 @@ class MessageHandler:
         Args:
             message: エラーメッセージ（エラーの内容）
         """
+        self._append("error", "ERROR", message)
+    
+    def begin_stream(self, tag: str = "assistant", prefix: str = "ASSISTANT"):
+        """
+        メッセージを少しずつ追加する表示（ストリーミング表示）を開始するメソッド
+        
+        LLMの回答をトークンごとに表示する場合、add_*_messageを使うと1トークンごとに
+        編集可能・不可の切り替えとスクロールが発生します。ストリーミング表示では、
+        開始時に1回だけ編集可能にし、end_stream()で1回だけ編集不可に戻してスクロールします。
+        
+        Args:
+            tag: 適用するスタイルのタグ
+            prefix: メッセージの前に付ける種別
+        
+        Returns:
+            テキストを追記する関数（write(text)）
+        """
+        self._streaming = True
         self.chat_display.config(state=tk.NORMAL)
-        timestamp = datetime.now().strftime("%H:%M:%S")
+        self.chat_display.insert(tk.END, f"[{self._timestamp()}] ", "timestamp")
+        self.chat_display.insert(tk.END, f"{prefix}: \n\n", tag)
+        self._trim_history()
+        
+        # 追記する位置をマーク（区切りの改行2つの直前）で覚えておく
+        # ストリーミング中に別のメッセージが追加されても、それより前（このメッセージの末尾）に追記される
+        self.chat_display.mark_set(STREAM_MARK, "end-3c")
+        self.chat_display.mark_gravity(STREAM_MARK, tk.RIGHT)
+        self.chat_display.see(tk.END)
         
-        # タイムスタンプを追加
-        self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
+        insert = self.chat_display.insert
         
-        # エラーメッセージを追加（"error"タグでスタイルを適用）
-        self.chat_display.insert(tk.END, f"ERROR: {message}\n\n", "error")
+        def write(text: str):
+            """ストリーミング中のメッセージにテキストを追記する"""
+            insert(STREAM_MARK, text, tag)
         
+        return write
+    
+    def end_stream(self):
+        """
+        ストリーミング表示を終了するメソッド
+        
+        テキストエリアを編集不可に戻して、最新の位置までスクロールします。
+        """
+        self._streaming = False
+        self.chat_display.mark_unset(STREAM_MARK)
         self.chat_display.config(state=tk.DISABLED)
         self.chat_display.see(tk.END)
     
@@ -141,5 +212,6 @@ class MessageHandler:
         # テキストエリアの内容をすべて削除
         self.chat_display.delete("1.0", tk.END)
         
-        # テキストエリアを編集不可に戻す
-        self.chat_display.config(state=tk.DISABLED)
+        # テキストエリアを編集不可に戻す（ストリーミング表示の途中の場合はend_stream()で戻す）
+        if not self._streaming:
+            self.chat_display.config(state=tk.DISABLED)
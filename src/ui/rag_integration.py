@@ -13,12 +13,27 @@ RAGシステム（PDFRagSystem、ReRankingRAG）との統合を管理するモ
 - RAGシステムの状態を一元管理することで、参照の整合性を保つ
 """
 
+import queue
 import threading
-from datetime import datetime
-from typing import Optional
+from typing import TYPE_CHECKING, NamedTuple, Optional
 
-from src.rag import PDFRagSystem, ReRankingRAG
-from langchain.prompts import PromptTemplate
+# プロンプトテンプレートの文字列だけを読み込む
+# （PDFRagSystem・ReRankingRAG・PromptTemplateはtorchやtransformersを読み込むため、使うときにインポートする）
+from src.rag import PROMPT_TEMPLATE
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import PromptTemplate
+    from src.rag import PDFRagSystem, ReRankingRAG
+
+
+class Turn(NamedTuple):
+    """
+    会話履歴の1発言
+    
+    辞書の代わりにタプルで保持して、1発言あたりのメモリを抑える。
+    """
+    role: str     # "user" または "assistant"
+    message: str  # 発言の内容
 
 
 class RAGIntegration:
@@ -38,26 +53,57 @@ class RAGIntegration:
         self.ui = ui_instance
         
         # RAGシステムのインスタンス変数（初期状態ではNone）
-        self.pdf_rag_system: Optional[PDFRagSystem] = None
-        self.rag_system: Optional[ReRankingRAG] = None
-        
-        # プロンプトテンプレートの設定
-        # LLMへの指示文のテンプレート（{context}と{question}が後で実際の値に置き換えられる）
-        self.prompt_template = PromptTemplate(
-            template="""【参考情報】
-{context}
-
-【質問】
-{question}
-
-【指示】
-- 必ず日本語で回答する
-- 文脈に書かれている事実のみを使用する
-- 推測や一般知識を混ぜない
-- 答えられない場合は正直にその旨を伝える
-- 余計な説明はせず「結論：〜」の1行だけ出力してください""",
-            input_variables=["context", "question"]
-        )
+        self.pdf_rag_system: Optional["PDFRagSystem"] = None
+        self.rag_system: Optional["ReRankingRAG"] = None
+        
+        # ファイルの読み込み中かどうか（SourceManagerが設定する。読み込み中は質問を受け付けない）
+        self.loading = False
+        
+        # プロンプトテンプレート（初めて参照されたときに作成する）
+        self._prompt_template: Optional["PromptTemplate"] = None
+        
+        # 質問応答処理を実行するスレッド（1つだけ、アプリの終了まで使い続ける）
+        # 質問ごとにスレッドを作らず、キューに入れた処理を順番に実行する
+        # （続けて質問した場合も、CrossEncoderやLLMの呼び出しが同時に走ってCPUを奪い合わない）
+        # daemon=True = メインプログラムが終了したら、このスレッドも終了する
+        self._jobs: "queue.Queue" = queue.Queue()
+        threading.Thread(target=self._worker, daemon=True).start()
+    
+    def _worker(self):
+        """キューに入った質問応答処理を、順番に1つずつ実行する（専用のスレッドで実行される）"""
+        while True:
+            job = self._jobs.get()
+            job()
+    
+    def wait_for_questions(self):
+        """
+        キューに入っている質問応答処理がすべて終わるまで待つ（読み込み用のスレッドから呼ばれる）
+        
+        キューの最後に目印の処理を入れ、それが実行されるまで待つ。
+        """
+        done = threading.Event()
+        self._jobs.put(done.set)
+        done.wait()
+    
+    @property
+    def prompt_template(self) -> "PromptTemplate":
+        """
+        プロンプトテンプレート
+        
+        LLMへの指示文のテンプレート（{context}と{question}が後で実際の値に置き換えられる）
+        """
+        if self._prompt_template is None:
+            from langchain_core.prompts import PromptTemplate
+            self._prompt_template = PromptTemplate(
+                template=PROMPT_TEMPLATE,
+                input_variables=["context", "question"]
+            )
+        return self._prompt_template
+    
+    @prompt_template.setter
+    def prompt_template(self, template: "PromptTemplate"):
+        """プロンプトテンプレートを設定する（次に作成するReRankingRAGから使われる）"""
+        self._prompt_template = template
     
     def send_message(self, user_input: str):
         """
@@ -75,6 +121,13 @@ class RAGIntegration:
         Args:
             user_input: ユーザーの質問
         """
+        # ファイルの読み込み中の場合（読み込みが終わるまでChroma DBのコレクションを使えない）
+        if self.loading:
+            self.ui.message_handler.add_error_message(
+                "ファイルを読み込んでいます。読み込みが終わってから質問してください。"
+            )
+            return
+        
         # PDFRagSystemが読み込まれていない場合
         if self.pdf_rag_system is None:
             self.ui.message_handler.add_error_message(
@@ -85,14 +138,27 @@ class RAGIntegration:
         # ReRankingRAGシステムが初期化されていない場合は初期化
         if self.rag_system is None:
             try:
+                from src.rag import ReRankingRAG
                 self.rag_system = ReRankingRAG(
                     docs=self.pdf_rag_system.docs,
-                    persist_dir=self.pdf_rag_system.persist_dir
+                    persist_dir=self.pdf_rag_system.persist_dir,
+                    bm25=self.pdf_rag_system.bm25
                 )
                 self.rag_system.prompt_template = self.prompt_template
             except Exception as e:
                 self.ui.message_handler.add_error_message(f"RAGシステムの初期化に失敗しました: {str(e)}")
                 return
+            
+            # 検索と並行して、LLMを読み込ませておく（失敗しても回答生成時に改めて読み込まれる）
+            threading.Thread(target=self._warm_up_llm, args=(self.rag_system,), daemon=True).start()
+        
+        # 検索重みを取得（Tkの変数は別スレッドから読まず、ここでfloatの値として受け取っておく）
+        w_sem, w_key = self.ui.current_search_weights()
+        
+        # この質問に使うRAGシステムをここで決めておく
+        # （質問はキューで順番を待つため、その間に別のファイルが読み込まれてself.rag_systemがNoneに
+        #   戻されても、質問したときのファイルで回答する）
+        rag_system = self.rag_system
         
         # 質問応答処理を別スレッドで実行（UIがフリーズしないように）
         def process_question():
@@ -102,47 +168,76 @@ class RAGIntegration:
             別スレッドで実行することで、UIを操作し続けられます。
             """
             try:
-                # 検索重みを取得（UIから取得）
-                w_sem = self.ui.semantic_weight.get()
-                w_key = self.ui.keyword_weight.get()
-                
-                # 検索開始メッセージを表示
-                self.ui.root.after(0, lambda: self.ui.message_handler.add_system_message("検索中..."))
-                
-                # 回答生成開始メッセージを表示
-                self.ui.root.after(0, lambda: self.ui.message_handler.add_system_message("回答を生成中..."))
+                # 処理中であることを状態表示の行に表示する
+                # （チャット表示エリアにはメッセージを追加しない。検索と回答生成は続けて行われるため、
+                #   「検索中...」は表示せず「回答を生成中...」の1回だけ更新する）
+                self.ui.root.after(0, self.ui.status_var.set, "回答を生成中...")
                 
                 # LLMで回答を生成（内部で検索とプロンプト生成が行われる）
-                raw_answer = self.rag_system.answer(
+                # 回答は生成されたそばからUIに表示する
+                raw_answer = self._add_assistant_stream(rag_system.stream_answer(
                     question=user_input,
                     k=5,
                     w_sem=w_sem,
                     w_key=w_key,
+                    # リランキングの候補数（Semantic検索・BM25検索の各60件を融合した上位60件）
+                    # 減らすとBM25でしか上位に来ない文書が先に落ちるため、検索精度を確認せずには減らさない
                     candidate_k=60
-                )
-                
-                # 回答をUIに表示
-                self.ui.root.after(0, lambda: self.ui.message_handler.add_assistant_message(raw_answer))
+                ))
                 
                 # 会話履歴に追加
-                self.ui.conversation_history.append({
-                    "role": "user",
-                    "message": user_input,
-                    "timestamp": datetime.now().isoformat()
-                })
-                self.ui.conversation_history.append({
-                    "role": "assistant",
-                    "message": raw_answer,
-                    "timestamp": datetime.now().isoformat()
-                })
+                self.ui.conversation_history.append(Turn("user", user_input))
+                self.ui.conversation_history.append(Turn("assistant", raw_answer))
                 
             except Exception as e:
                 # エラーが発生した場合、エラーメッセージを表示
-                self.ui.root.after(0, lambda: self.ui.message_handler.add_error_message(
-                    f"エラーが発生しました: {str(e)}"
-                ))
+                # （変数eはexceptブロックを抜けると削除されるため、文字列にしてから渡す）
+                self.ui.root.after(0, self.ui.message_handler.add_error_message, f"エラーが発生しました: {str(e)}")
+            finally:
+                # 状態表示を消す
+                self.ui.root.after(0, self.ui.status_var.set, "")
         
-        # 別スレッドを開始
-        # daemon=True = メインプログラムが終了したら、このスレッドも終了する
-        thread = threading.Thread(target=process_question, daemon=True)
-        thread.start()
+        # 質問応答処理用のスレッドに渡す（前の質問の処理中であれば、その後に実行される）
+        self._jobs.put(process_question)
+    
+    def _add_assistant_stream(self, pieces) -> str:
+        """
+        回答の断片を受け取るたびにUIに追記する（別スレッドで実行される）
+        
+        表示の開始・追記・終了はroot.afterでTkのスレッドに任せる
+        （root.afterに登録した処理は登録した順に実行されるため、追記の順序は入れ替わらない）。
+        最初の断片が届くまではアシスタントのメッセージを作らないため、検索やLLMの呼び出しで
+        エラーになった場合に空のメッセージが残らない。
+        
+        Args:
+            pieces: 回答の断片を返すイテレータ（ReRankingRAG.stream_answer()）
+        
+        Returns:
+            断片をつなげた回答全体
+        """
+        message_handler = self.ui.message_handler
+        writer = []  # begin_stream()が返す追記用の関数（Tkのスレッドで設定される）
+        received = []
+        try:
+            for piece in pieces:
+                if not received:
+                    self.ui.root.after(0, lambda: writer.append(message_handler.begin_stream()))
+                received.append(piece)
+                self.ui.root.after(0, lambda piece=piece: writer[0](piece))
+        finally:
+            if received:
+                self.ui.root.after(0, message_handler.end_stream)
+        return "".join(received)
+    
+    @staticmethod
+    def _warm_up_llm(rag_system: "ReRankingRAG"):
+        """
+        LLMを事前に読み込む（別スレッドで実行される）
+        
+        Ollamaが起動していないなどで失敗した場合は何もしない
+        （エラーは実際の回答生成時に表示される）。
+        """
+        try:
+            rag_system.warm_up()
+        except Exception:
+            pass
@@ -7,15 +7,25 @@
 - PDFファイルの選択: 単一のPDFファイルを選択して読み込む
 - テキストファイルの選択: .txtファイルを選択して読み込む
 - 読み込んだファイルの表示: ファイル名をラベルに表示
+
+ファイルの読み込み（テキスト抽出・埋め込みの計算）は時間がかかるため、別スレッドで実行し、
+結果の表示だけをTkのスレッド（root.after）で行います。
 """
 
+import importlib
 import os
-from typing import Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Optional, Tuple
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
 
-from src.rag import PDFRagSystem
+if TYPE_CHECKING:
+    from src.rag import PDFRagSystem
+
+
+# ファイルの種類（_import_fileのfile_type）→ ファイル名の前に表示する種類の表記
+FILE_TYPE_LABELS = {"pdf": "PDF", "text": "TXT"}
 
 
 class SourceManager:
@@ -33,6 +43,55 @@ class SourceManager:
             ui_instance: RAGTerminalUIのインスタンス（他のコンポーネントにアクセスするため）
         """
         self.ui = ui_instance
+        
+        # ファイル読み込み用のスレッド（1つだけ）
+        # 読み込みは同じChroma DBのフォルダに書き込むため、複数のファイルを同時には読み込まず、順番に処理する
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        
+        # RAGシステムのモジュール（torch、sentence-transformersなど）と埋め込みモデルを、
+        # ユーザーがファイルを選ぶまでの間に読み込んでおく
+        # （同じスレッドで実行するため、ファイルの読み込みは必ずこの後に行われる）
+        self._executor.submit(self._preload_rag)
+        
+        # 読み込み済みのファイル（絶対パス, 更新日時, サイズ）
+        # 同じファイルが選び直された場合は、読み込みをやり直さない
+        self._loaded_source: Optional[Tuple[str, int, int]] = None
+        
+        # 読み込みを始めて、まだ終わっていないファイルの数（Tkのスレッドだけで読み書きする）
+        self._pending_loads = 0
+    
+    @staticmethod
+    def _source_key(path: str) -> Optional[Tuple[str, int, int]]:
+        """
+        ファイルを識別するキー（絶対パス, 更新日時, サイズ）を返す
+        
+        ファイルの中身を読まずに計算できるため、同じファイルかどうかの判定に使う
+        （更新日時かサイズが変わっていれば、別のファイルとして読み込み直す）。
+        ファイルの情報を取得できない場合はNoneを返す（エラーは読み込み時に表示される）。
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    
+    def _is_already_loaded(self, key: Optional[Tuple[str, int, int]], path: str) -> bool:
+        """選ばれたファイルが読み込み済みのファイルと同じであれば、その旨を表示してTrueを返す"""
+        if key is not None and key == self._loaded_source:
+            self.ui.message_handler.add_system_message(
+                f"既に読み込まれています: {os.path.basename(path)}"
+            )
+            return True
+        return False
+    
+    @staticmethod
+    def _preload_rag():
+        """RAGシステムのモジュールと埋め込みモデルを事前に読み込む（読み込み用のスレッドで実行される）"""
+        # モジュールを読み込むこと自体が目的のため、名前は使わない（torchなどの読み込みを先に済ませる）
+        importlib.import_module("src.rag.loaders.pdf")
+        importlib.import_module("src.rag.models.single_source")
+        from src.rag.utils.embeddings import get_embeddings
+        get_embeddings()
     
     def select_pdf_file(self):
         """
@@ -72,71 +131,181 @@ class SourceManager:
         """
         PDFファイルをPDFRagSystemに読み込むメソッド
         
+        読み込みは別スレッドで行い、完了したら_on_pdf_loaded()で結果を表示する。
+        
+        Args:
+            pdf_path: PDFファイルのパス
+        """
+        key = self._source_key(pdf_path)
+        if self._is_already_loaded(key, pdf_path):
+            return
+        
+        self.ui.message_handler.add_system_message(
+            f"PDFファイルを読み込んでいます: {os.path.basename(pdf_path)}"
+        )
+        self._begin_load()
+        future = self._executor.submit(self._import_file, pdf_path, "pdf")
+        # 完了の通知は読み込み用のスレッドで呼ばれるため、表示はroot.afterでTkのスレッドに任せる
+        future.add_done_callback(lambda f: self.ui.root.after(0, self._on_pdf_loaded, f, pdf_path, key))
+    
+    def load_text_file(self, text_path: str):
+        """
+        テキストファイルをPDFRagSystemに読み込むメソッド
+        
+        読み込みは別スレッドで行い、完了したら_on_text_file_loaded()で結果を表示する。
+        
+        Args:
+            text_path: テキストファイルのパス
+        """
+        key = self._source_key(text_path)
+        if self._is_already_loaded(key, text_path):
+            return
+        
+        self.ui.message_handler.add_system_message(
+            f"テキストファイルを読み込んでいます: {os.path.basename(text_path)}"
+        )
+        self._begin_load()
+        future = self._executor.submit(self._import_file, text_path, "text")
+        # 完了の通知は読み込み用のスレッドで呼ばれるため、表示はroot.afterでTkのスレッドに任せる
+        future.add_done_callback(lambda f: self.ui.root.after(0, self._on_text_file_loaded, f, text_path, key))
+    
+    def _begin_load(self):
+        """
+        ファイルの読み込みを始める前の処理（Tkのスレッドで実行される）
+        
+        読み込みはChroma DBのコレクションを削除して作り直すため、読み込みが終わるまでは
+        現在のRAGシステムを外して、新しい質問を受け付けないようにする。
+        """
+        self._pending_loads += 1
+        self._loaded_source = None
+        self.ui.rag_integration.loading = True
+        self._set_pdf_rag_system(None)
+    
+    def _end_load(self) -> bool:
+        """
+        ファイルの読み込みが終わったときの処理（Tkのスレッドで実行される）
+        
+        Returns:
+            この後に読み込むファイルがなければTrue（読み込んだPDFRagSystemを使ってよい）
+        """
+        self._pending_loads -= 1
+        self.ui.rag_integration.loading = self._pending_loads > 0
+        return self._pending_loads == 0
+    
+    def _import_file(self, file_path: str, file_type: str) -> "PDFRagSystem":
+        """
+        ファイルを読み込んでPDFRagSystemを作成する（読み込み用のスレッドで実行される）
+        
+        読み込みを始める前に受け付けた質問は、前のファイルのコレクションで回答するため、
+        それらの処理が終わるのを待ってからコレクションを作り直す。
+        
+        Args:
+            file_path: ファイルのパス
+            file_type: "pdf" または "text"
+        
+        Returns:
+            読み込み済みのPDFRagSystem
+        """
+        from src.rag import PDFRagSystem
+        
+        self.ui.rag_integration.wait_for_questions()
+        
+        # PDFRagSystemを初期化（chunk_size=1200, chunk_overlap=200）
+        pdf_rag = PDFRagSystem(
+            persist_dir="./chroma_db",
+            chunk_size=1200,
+            chunk_overlap=200,
+            min_chunk_length=300
+        )
+        
+        # ファイルを読み込む（自動的にインデックスも構築される）
+        if file_type == "pdf":
+            pdf_rag.import_pdf(file_path)
+        else:
+            pdf_rag.import_text_file(file_path)
+        return pdf_rag
+    
+    def _on_pdf_loaded(self, future: Future, pdf_path: str, key: Optional[Tuple[str, int, int]] = None):
+        """
+        PDFファイルの読み込みが終わったときの処理（Tkのスレッドで実行される）
+        
         Args:
+            future: 読み込み処理のFuture（結果は読み込み済みのPDFRagSystem）
             pdf_path: PDFファイルのパス
+            key: ファイルを識別するキー（_source_key()の戻り値）
         """
+        is_last = self._end_load()
         try:
-            # PDFRagSystemを初期化（chunk_size=1200, chunk_overlap=200）
-            pdf_rag = PDFRagSystem(
-                persist_dir="./chroma_db",
-                chunk_size=1200,
-                chunk_overlap=200,
-                min_chunk_length=300
-            )
-            
-            # PDFファイルを読み込む（自動的にインデックスも構築される）
-            pdf_rag.import_pdf(pdf_path)
-            
-            # RAG統合コンポーネントに保存
-            self.ui.rag_integration.pdf_rag_system = pdf_rag
-            self.ui.pdf_rag_system = pdf_rag
-            
-            # ファイル名を表示
-            self.update_file_display(os.path.basename(pdf_path), "PDF")
-            
-            # 成功メッセージを表示
-            self.ui.message_handler.add_system_message(
-                f"PDFファイルを読み込みました: {os.path.basename(pdf_path)}\n"
-                f"チャンク数: {len(pdf_rag.docs)}\n"
-                f"質問を開始できます。"
-            )
+            pdf_rag = future.result()
         except Exception as e:
             self.ui.message_handler.add_error_message(f"PDFファイルの読み込みに失敗しました: {str(e)}")
+            return
+        
+        # 続けて別のファイルの読み込みが始まっている場合は、そちらの結果を使う
+        # （このファイルのコレクションは、次の読み込みで作り直される）
+        if not is_last:
+            return
+        
+        self._set_pdf_rag_system(pdf_rag)
+        self._loaded_source = key
+        
+        # ファイル名を表示
+        filename = os.path.basename(pdf_path)
+        self.update_file_display(filename, FILE_TYPE_LABELS["pdf"])
+        
+        # 成功メッセージを表示
+        self.ui.message_handler.add_system_message(
+            f"PDFファイルを読み込みました: {filename}\n"
+            f"チャンク数: {len(pdf_rag.docs)}\n"
+            f"質問を開始できます。"
+        )
     
-    def load_text_file(self, text_path: str):
+    def _on_text_file_loaded(self, future: Future, text_path: str, key: Optional[Tuple[str, int, int]] = None):
         """
-        テキストファイルをPDFRagSystemに読み込むメソッド
+        テキストファイルの読み込みが終わったときの処理（Tkのスレッドで実行される）
         
         Args:
+            future: 読み込み処理のFuture（結果は読み込み済みのPDFRagSystem）
             text_path: テキストファイルのパス
+            key: ファイルを識別するキー（_source_key()の戻り値）
         """
+        is_last = self._end_load()
         try:
-            # PDFRagSystemを初期化（chunk_size=1200, chunk_overlap=200）
-            pdf_rag = PDFRagSystem(
-                persist_dir="./chroma_db",
-                chunk_size=1200,
-                chunk_overlap=200,
-                min_chunk_length=300
-            )
-            
-            # テキストファイルを読み込む（自動的にインデックスも構築される）
-            pdf_rag.import_text_file(text_path)
-            
-            # RAG統合コンポーネントに保存
-            self.ui.rag_integration.pdf_rag_system = pdf_rag
-            self.ui.pdf_rag_system = pdf_rag
-            
-            # ファイル名を表示
-            self.update_file_display(os.path.basename(text_path), "TXT")
-            
-            # 成功メッセージを表示
-            self.ui.message_handler.add_system_message(
-                f"テキストファイルを読み込みました: {os.path.basename(text_path)}\n"
-                f"チャンク数: {len(pdf_rag.docs)}\n"
-                f"質問を開始できます。"
-            )
+            pdf_rag = future.result()
         except Exception as e:
             self.ui.message_handler.add_error_message(f"テキストファイルの読み込みに失敗しました: {str(e)}")
+            return
+        
+        # 続けて別のファイルの読み込みが始まっている場合は、そちらの結果を使う
+        # （このファイルのコレクションは、次の読み込みで作り直される）
+        if not is_last:
+            return
+        
+        self._set_pdf_rag_system(pdf_rag)
+        self._loaded_source = key
+        
+        # ファイル名を表示
+        filename = os.path.basename(text_path)
+        self.update_file_display(filename, FILE_TYPE_LABELS["text"])
+        
+        # 成功メッセージを表示
+        self.ui.message_handler.add_system_message(
+            f"テキストファイルを読み込みました: {filename}\n"
+            f"チャンク数: {len(pdf_rag.docs)}\n"
+            f"質問を開始できます。"
+        )
+    
+    def _set_pdf_rag_system(self, pdf_rag: Optional["PDFRagSystem"]):
+        """
+        読み込んだPDFRagSystemをRAG統合コンポーネントに保存する
+        
+        Args:
+            pdf_rag: 読み込み済みのPDFRagSystem（Noneの場合は、質問を受け付けない状態にする）
+        """
+        # 前のファイル用のReRankingRAG（検索器やキャッシュ）は破棄し、次の質問時に作り直す
+        self.ui.rag_integration.pdf_rag_system = pdf_rag
+        self.ui.rag_integration.rag_system = None
+        self.ui.pdf_rag_system = pdf_rag
     
     def update_file_display(self, filename: str, file_type: str):
         """
@@ -6,6 +6,7 @@ Tkinterを用いたターミナル風チャットUIのメインクラス。
 """
 
 import tkinter as tk
+from collections import deque
 from typing import Optional
 
 # 分割されたモジュールをインポート
@@ -15,6 +16,12 @@ from .event_handler import EventHandler
 from .source_manager import SourceManager
 from .rag_integration import RAGIntegration
 
+# 会話履歴として保持する発言数の上限（古いものから自動的に破棄される）
+MAX_HISTORY_TURNS = 50
+
+# 検索重みのスライダーを動かし終えてから、値を反映するまでの待ち時間（ミリ秒）
+WEIGHT_DEBOUNCE_MS = 80
+
 
 class RAGTerminalUI:
     """
@@ -59,10 +66,10 @@ class RAGTerminalUI:
         # これらの変数は、後でファイルが読み込まれたときに更新される
         self.pdf_rag_system: Optional = None
         self.rag_system: Optional = None
-        self.prompt_template = self.rag_integration.prompt_template
         
         # 会話履歴の管理（将来、会話履歴を活用する機能を追加する場合に備えて保存）
-        self.conversation_history = []
+        # 直近MAX_HISTORY_TURNS件のTurn(role, message)だけを保持し、長いセッションでも増え続けないようにする
+        self.conversation_history = deque(maxlen=MAX_HISTORY_TURNS)
         
         # =========================================
         # UIの構築
@@ -77,9 +84,20 @@ class RAGTerminalUI:
         self.semantic_weight = top_widgets['semantic_weight']
         self.keyword_weight = top_widgets['keyword_weight']
         
+        # 検索重みの現在値（Tkの変数ではなく、通常のfloatのタプルで保持する）
+        # スライダーはドラッグ中に細かく値を書き込むため、書き込みのたびには読み直さず、
+        # 動きが止まってからWEIGHT_DEBOUNCE_MSミリ秒後に1回だけ読み直す
+        self.search_weights = (self.semantic_weight.get(), self.keyword_weight.get())
+        self._pending_weight_update: Optional[str] = None
+        self.semantic_weight.trace_add("write", self._on_weight_changed)
+        self.keyword_weight.trace_add("write", self._on_weight_changed)
+        
         # チャット表示エリアを構築
         self.chat_display = UIBuilder.build_chat_display(main_frame)
         
+        # 状態表示の行を構築（チャット表示エリアの下）
+        self.status_var = UIBuilder.build_status_bar(main_frame)
+        
         # 入力エリアを構築
         self.input_field = UIBuilder.build_input_area(main_frame, self)
         
@@ -117,6 +135,47 @@ class RAGTerminalUI:
         """テキストファイルを選択するメソッド（SourceManagerに委譲）"""
         self.source_manager.select_text_file()
     
+    @property
+    def prompt_template(self):
+        """プロンプトテンプレート（RAG統合コンポーネントへの委譲）"""
+        return self.rag_integration.prompt_template
+    
+    @prompt_template.setter
+    def prompt_template(self, template):
+        """プロンプトテンプレートを設定する（RAG統合コンポーネントへの委譲）"""
+        self.rag_integration.prompt_template = template
+    
+    # =========================================
+    # 検索重みの管理
+    # =========================================
+    
+    def _on_weight_changed(self, *args):
+        """
+        検索重みのスライダーが動いたときの処理
+        
+        前回予約した反映処理を取り消して、予約し直す
+        （ドラッグ中の連続した書き込みを、動きが止まったときの1回にまとめる）。
+        """
+        if self._pending_weight_update is not None:
+            self.root.after_cancel(self._pending_weight_update)
+        self._pending_weight_update = self.root.after(WEIGHT_DEBOUNCE_MS, self._apply_weight_change)
+    
+    def _apply_weight_change(self):
+        """スライダーの値を読み直して、検索重みの現在値を更新する"""
+        self._pending_weight_update = None
+        self.search_weights = (self.semantic_weight.get(), self.keyword_weight.get())
+    
+    def current_search_weights(self):
+        """
+        検索重みの現在値 (w_sem, w_key) を返す（Tkのスレッドから呼ぶ）
+        
+        スライダーを動かした直後で反映が予約中の場合は、待たずにその場で反映してから返す。
+        """
+        if self._pending_weight_update is not None:
+            self.root.after_cancel(self._pending_weight_update)
+            self._apply_weight_change()
+        return self.search_weights
+    
     # =========================================
     # RAG統合メソッド（RAGIntegrationへの委譲）
     # =========================================
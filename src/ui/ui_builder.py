@@ -6,6 +6,7 @@ UI構築モジュール
 このモジュールは、UIウィジェットの作成と配置を担当します：
 - 上部フレーム: ソース追加ボタン、ソース一覧、検索重み設定
 - チャット表示エリア: 会話履歴を表示するスクロール可能なテキストエリア
+- 状態表示: 「回答を生成中...」などの状態を表示する1行のラベル
 - 入力エリア: ユーザーが質問を入力するテキストフィールドと送信・クリアボタン
 
 各ウィジェットは、ダークテーマ（GitHub風）で統一されたデザインになっています。
@@ -29,6 +30,79 @@ class UIBuilder:
     - ダークテーマで統一されたデザインを提供
     """
     
+    # ボタンのスタイル（色・フォントなど）
+    # ボタンごとに同じオプションを書き並べず、種類（variant）ごとに1回だけ定義して使い回す
+    _STYLES = {
+        # ファイル選択ボタン
+        "dark_button": dict(
+            bg="#2d2d2d",
+            fg="#c9d1d9",
+            activebackground="#3d3d3d",
+            activeforeground="#c9d1d9",
+            relief=tk.FLAT,
+            padx=10,
+            pady=5,
+            font=("Consolas", 9)
+        ),
+        # 送信ボタン
+        "send_button": dict(
+            bg="#238636",
+            fg="#ffffff",
+            activebackground="#2ea043",
+            activeforeground="#ffffff",
+            relief=tk.FLAT,
+            padx=20,
+            pady=10,
+            font=("Consolas", 10, "bold"),
+            cursor="hand2"
+        ),
+        # クリアボタン
+        "clear_button": dict(
+            bg="#da3633",
+            fg="#ffffff",
+            activebackground="#f85149",
+            activeforeground="#ffffff",
+            relief=tk.FLAT,
+            padx=15,
+            pady=10,
+            font=("Consolas", 10),
+            cursor="hand2"
+        ),
+    }
+    
+    # 上部フレームのラベルのスタイル
+    _LABEL_STYLE = dict(bg="#1e1e1e", fg="#c9d1d9", font=("Consolas", 9))
+    
+    # 検索重みスライダーのスタイル
+    _SCALE_STYLE = dict(
+        from_=0.0,
+        to=1.0,
+        resolution=0.1,
+        orient=tk.HORIZONTAL,
+        bg="#2d2d2d",
+        fg="#c9d1d9",
+        troughcolor="#1e1e1e",
+        activebackground="#3d3d3d",
+        length=100,
+        font=("Consolas", 8)
+    )
+    
+    @staticmethod
+    def _mk_button(parent, text, command, variant):
+        """
+        登録済みのスタイルでボタンを作成するメソッド
+        
+        Args:
+            parent: 親ウィジェット
+            text: ボタンに表示する文字列
+            command: クリックされたときに呼ぶ関数
+            variant: スタイルの種類（_STYLESのキー）
+        
+        Returns:
+            tk.Button: 作成したボタン
+        """
+        return tk.Button(parent, text=text, command=command, **UIBuilder._STYLES[variant])
+    
     @staticmethod
     def build_top_frame(main_frame, ui_instance):
         """
@@ -65,34 +139,14 @@ class UIBuilder:
         button_frame.pack(side=tk.LEFT, padx=(0, 10))
         
         # PDF選択ボタン
-        pdf_button = tk.Button(
-            button_frame,
-            text="PDF選択",
-            command=ui_instance._select_pdf_file,
-            bg="#2d2d2d",
-            fg="#c9d1d9",
-            activebackground="#3d3d3d",
-            activeforeground="#c9d1d9",
-            relief=tk.FLAT,
-            padx=10,
-            pady=5,
-            font=("Consolas", 9)
+        pdf_button = UIBuilder._mk_button(
+            button_frame, "PDF選択", ui_instance._select_pdf_file, "dark_button"
         )
         pdf_button.pack(side=tk.LEFT, padx=(0, 5))
         
         # テキストファイル選択ボタン
-        text_file_button = tk.Button(
-            button_frame,
-            text="テキストファイル選択",
-            command=ui_instance._select_text_file,
-            bg="#2d2d2d",
-            fg="#c9d1d9",
-            activebackground="#3d3d3d",
-            activeforeground="#c9d1d9",
-            relief=tk.FLAT,
-            padx=10,
-            pady=5,
-            font=("Consolas", 9)
+        text_file_button = UIBuilder._mk_button(
+            button_frame, "テキストファイル選択", ui_instance._select_text_file, "dark_button"
         )
         text_file_button.pack(side=tk.LEFT)
         
@@ -101,13 +155,7 @@ class UIBuilder:
         file_display_frame.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
         
         # ファイル名のラベル
-        tk.Label(
-            file_display_frame,
-            text="読み込んだファイル:",
-            bg="#1e1e1e",
-            fg="#c9d1d9",
-            font=("Consolas", 9)
-        ).pack(side=tk.LEFT, padx=(0, 5))
+        tk.Label(file_display_frame, text="読み込んだファイル:", **UIBuilder._LABEL_STYLE).pack(side=tk.LEFT, padx=(0, 5))
         
         # ファイル名を表示するラベル
         file_label = tk.Label(
@@ -128,57 +176,19 @@ class UIBuilder:
         weight_frame.pack(side=tk.RIGHT)
         
         # Semantic検索の重みラベル
-        tk.Label(
-            weight_frame,
-            text="Semantic:",
-            bg="#1e1e1e",
-            fg="#c9d1d9",
-            font=("Consolas", 9)
-        ).pack(side=tk.LEFT, padx=(0, 5))
+        tk.Label(weight_frame, text="Semantic:", **UIBuilder._LABEL_STYLE).pack(side=tk.LEFT, padx=(0, 5))
         
         # Semantic検索の重みを調整するスライダー
         semantic_weight = tk.DoubleVar(value=0.5)
-        semantic_scale = tk.Scale(
-            weight_frame,
-            from_=0.0,
-            to=1.0,
-            resolution=0.1,
-            orient=tk.HORIZONTAL,
-            variable=semantic_weight,
-            bg="#2d2d2d",
-            fg="#c9d1d9",
-            troughcolor="#1e1e1e",
-            activebackground="#3d3d3d",
-            length=100,
-            font=("Consolas", 8)
-        )
+        semantic_scale = tk.Scale(weight_frame, variable=semantic_weight, **UIBuilder._SCALE_STYLE)
         semantic_scale.pack(side=tk.LEFT, padx=(0, 10))
         
         # Keyword検索の重みラベル
-        tk.Label(
-            weight_frame,
-            text="Keyword:",
-            bg="#1e1e1e",
-            fg="#c9d1d9",
-            font=("Consolas", 9)
-        ).pack(side=tk.LEFT, padx=(0, 5))
+        tk.Label(weight_frame, text="Keyword:", **UIBuilder._LABEL_STYLE).pack(side=tk.LEFT, padx=(0, 5))
         
         # Keyword検索の重みを調整するスライダー
         keyword_weight = tk.DoubleVar(value=0.5)
-        keyword_scale = tk.Scale(
-            weight_frame,
-            from_=0.0,
-            to=1.0,
-            resolution=0.1,
-            orient=tk.HORIZONTAL,
-            variable=keyword_weight,
-            bg="#2d2d2d",
-            fg="#c9d1d9",
-            troughcolor="#1e1e1e",
-            activebackground="#3d3d3d",
-            length=100,
-            font=("Consolas", 8)
-        )
+        keyword_scale = tk.Scale(weight_frame, variable=keyword_weight, **UIBuilder._SCALE_STYLE)
         keyword_scale.pack(side=tk.LEFT)
         
         # 構築したウィジェットの参照を返す
@@ -232,6 +242,32 @@ class UIBuilder:
         
         return chat_display
     
+    @staticmethod
+    def build_status_bar(main_frame):
+        """
+        状態表示の行を構築するメソッド
+        
+        「回答を生成中...」などの一時的な状態を、チャット表示エリアにメッセージとして追加せずに、
+        その下の1行のラベルに表示します（StringVarの値を変えるだけで表示が更新される）。
+        
+        Args:
+            main_frame: メインフレーム（親コンテナ）
+        
+        Returns:
+            tk.StringVar: 表示する状態の文字列を保持する変数（空文字列の場合は何も表示しない）
+        """
+        status_var = tk.StringVar(value="")
+        tk.Label(
+            main_frame,
+            textvariable=status_var,
+            bg="#1e1e1e",
+            fg="#6e7681",
+            font=("Consolas", 9),
+            anchor=tk.W
+        ).pack(fill=tk.X, pady=(0, 5))
+        
+        return status_var
+    
     @staticmethod
     def build_input_area(main_frame, ui_instance):
         """
@@ -272,36 +308,14 @@ class UIBuilder:
         input_field.bind("<Shift-Return>", ui_instance._on_shift_enter)
         
         # 送信ボタン
-        send_button = tk.Button(
-            input_frame,
-            text="送信",
-            command=ui_instance._send_message,
-            bg="#238636",
-            fg="#ffffff",
-            activebackground="#2ea043",
-            activeforeground="#ffffff",
-            relief=tk.FLAT,
-            padx=20,
-            pady=10,
-            font=("Consolas", 10, "bold"),
-            cursor="hand2"
+        send_button = UIBuilder._mk_button(
+            input_frame, "送信", ui_instance._send_message, "send_button"
         )
         send_button.pack(side=tk.RIGHT)
         
         # クリアボタン
-        clear_button = tk.Button(
-            input_frame,
-            text="クリア",
-            command=ui_instance._clear_chat,
-            bg="#da3633",
-            fg="#ffffff",
-            activebackground="#f85149",
-            activeforeground="#ffffff",
-            relief=tk.FLAT,
-            padx=15,
-            pady=10,
-            font=("Consolas", 10),
-            cursor="hand2"
+        clear_button = UIBuilder._mk_button(
+            input_frame, "クリア", ui_instance._clear_chat, "clear_button"
         )
         clear_button.pack(side=tk.RIGHT, padx=(0, 10))
         
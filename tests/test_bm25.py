@@ -0,0 +1,59 @@
+"""
+NumpyBM25Retriever のテスト
+
+スコアがrank_bm25のBM25Okapi（LangChainのBM25Retrieverが使う実装）と一致することを確かめる。
+"""
+
+import numpy as np
+import pytest
+
+rank_bm25 = pytest.importorskip("rank_bm25")
+pytest.importorskip("langchain")
+
+from langchain.docstore.document import Document
+
+from src.rag.retrievers.bm25 import NumpyBM25Retriever
+from src.rag.utils.text import tokenize_for_bm25
+
+TEXTS = [
+    "lsコマンドでファイルの一覧を表示する。ls -l で詳細を表示する。",
+    "grepコマンドはファイルの中から文字列を検索する。",
+    "findコマンドでファイルを検索する。find / -name で名前を指定する。",
+    "chmodコマンドでファイルのパーミッションを変更する。",
+    "ユーザーを追加するにはuseraddコマンドを使う。",
+    "ファイルをコピーするにはcpコマンド、移動するにはmvコマンドを使う。",
+    "The kernel loads modules with modprobe and lists them with lsmod.",
+    "tarコマンドでファイルをまとめる。tar -czf で圧縮する。",
+]
+
+QUERIES = [
+    "ファイルを検索するコマンド",
+    "ls",
+    "コマンド コマンド ファイル",  # 重複する単語と、半数以上の文書に出る（IDFが負になる）単語
+    "modprobe kernel",
+    "存在しない単語 xyz",
+    "",
+]
+
+
+@pytest.fixture(scope="module")
+def retrievers():
+    docs = [Document(page_content=text) for text in TEXTS]
+    numpy_bm25 = NumpyBM25Retriever.from_documents(docs, k=len(docs))
+    okapi = rank_bm25.BM25Okapi([tokenize_for_bm25(text) for text in TEXTS])
+    return numpy_bm25, okapi
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_scores_match_bm25okapi(retrievers, query):
+    numpy_bm25, okapi = retrievers
+    tokens = tokenize_for_bm25(query)
+    np.testing.assert_allclose(numpy_bm25.get_scores(tokens), okapi.get_scores(tokens), rtol=1e-9, atol=1e-12)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_ranks_by_bm25okapi_scores(retrievers, query):
+    numpy_bm25, okapi = retrievers
+    scores = okapi.get_scores(tokenize_for_bm25(query))
+    expected = sorted(range(len(TEXTS)), key=lambda i: -scores[i])
+    assert [doc.page_content for doc in numpy_bm25.search(query)] == [TEXTS[i] for i in expected]
@@ -0,0 +1,64 @@
+"""
+_reciprocal_rank_fusion のテスト
+
+LangChainのEnsembleRetriever.weighted_reciprocal_rank()と同じ順位になることを確かめる。
+"""
+
+import random
+from typing import List
+
+import pytest
+
+# _reciprocal_rank_fusionはsingle_source.pyにあるため、そのモジュールが読み込むライブラリがすべて必要
+pytest.importorskip("torch")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("langchain")
+pytest.importorskip("langchain_community")
+from langchain.retrievers import EnsembleRetriever
+from langchain.docstore.document import Document
+from langchain_core.retrievers import BaseRetriever
+
+from src.rag.models.single_source import _reciprocal_rank_fusion
+
+
+class _StaticRetriever(BaseRetriever):
+    """EnsembleRetrieverを作るためだけの検索器（検索はしない）"""
+
+    def _get_relevant_documents(self, query: str, *, run_manager) -> List[Document]:
+        return []
+
+
+def _ensemble_fusion(result_lists, weights):
+    ensemble = EnsembleRetriever(retrievers=[_StaticRetriever(), _StaticRetriever()], weights=weights)
+    return ensemble.weighted_reciprocal_rank(result_lists)
+
+
+def _random_results(seed):
+    """2つの検索器の結果（一部の文書が重複する）を作る"""
+    rng = random.Random(seed)
+    pool = [Document(page_content=f"chunk {i}") for i in range(80)]
+    return [rng.sample(pool, 60), rng.sample(pool, 60)]
+
+
+@pytest.mark.parametrize("weights", [[0.5, 0.5], [0.7, 0.3], [0.0, 1.0], [1.0, 0.0]])
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_ensemble_retriever(weights, seed):
+    result_lists = _random_results(seed)
+    expected = [doc.page_content for doc in _ensemble_fusion(result_lists, weights)]
+    actual = [doc.page_content for doc in _reciprocal_rank_fusion(result_lists, weights, limit=len(expected))]
+    assert actual == expected
+
+
+def test_ties_keep_first_appearance():
+    # 重みが等しく、同じ順位に別の文書がある場合は同点になる（先に現れた文書が上位）
+    sem = [Document(page_content=text) for text in ["a", "b", "c"]]
+    key = [Document(page_content=text) for text in ["d", "e", "a"]]
+    expected = [doc.page_content for doc in _ensemble_fusion([sem, key], [0.5, 0.5])]
+    actual = [doc.page_content for doc in _reciprocal_rank_fusion([sem, key], [0.5, 0.5], limit=10)]
+    assert actual == expected
+
+
+def test_limit_and_empty():
+    result_lists = _random_results(0)
+    assert len(_reciprocal_rank_fusion(result_lists, [0.5, 0.5], limit=10)) == 10
+    assert _reciprocal_rank_fusion([[], []], [0.5, 0.5], limit=10) == []
@@ -0,0 +1,38 @@
+"""
+top_k_indices のテスト
+
+Pythonのsorted()（スコアの降順、同点は元の順番）で選んだ上位k件と一致することを確かめる。
+"""
+
+import numpy as np
+import pytest
+
+from src.rag.utils.ranking import top_k_indices
+
+
+def _sorted_top_k(scores, k):
+    """比較用：sorted()で上位k件のインデックスを選ぶ（同点は先に現れたものを優先）"""
+    return sorted(range(len(scores)), key=lambda i: -scores[i])[:max(k, 0)]
+
+
+@pytest.mark.parametrize("k", [0, 1, 5, 60, 200, 250])
+def test_matches_sorted(k):
+    scores = np.random.default_rng(0).normal(size=200)
+    assert top_k_indices(scores, k).tolist() == _sorted_top_k(scores, k)
+
+
+@pytest.mark.parametrize("k", [1, 3, 10, 30, 99, 100])
+def test_matches_sorted_with_ties(k):
+    # スコアの種類を少なくして、上位k件の境界をまたぐ同点を多く作る
+    scores = np.random.default_rng(1).integers(0, 5, size=100).astype(float)
+    assert top_k_indices(scores, k).tolist() == _sorted_top_k(scores, k)
+
+
+def test_all_tied():
+    scores = np.zeros(50)
+    assert top_k_indices(scores, 7).tolist() == list(range(7))
+
+
+def test_infinite_scores():
+    scores = np.array([1.0, -np.inf, 3.0, np.inf, -np.inf, 2.0])
+    assert top_k_indices(scores, 4).tolist() == _sorted_top_k(scores.tolist(), 4)